@@ -14,24 +14,101 @@ class Settings(BaseSettings):
     """
 
     # --- MongoDB ---
-    MONGO_URI: str = Field(..., description="MongoDB connection string")
+    MONGO_URI: str = Field(..., description="MongoDB connection string")  # server must be 5.0+ (see README)
     MONGO_DB: str = "shop_db"
+    # Pool/driver options: unset (None/"") leaves the option to MONGO_URI, then the driver default
+    MONGO_MAX_POOL_SIZE: Optional[int] = None  # connections per server, per worker process (driver: 100)
+    MONGO_MIN_POOL_SIZE: Optional[int] = None  # kept open (and pre-warmed) even when idle (driver: 0)
+    MONGO_MAX_IDLE_TIME_MS: Optional[int] = None  # close pooled connections idle longer than this
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: Optional[int] = None  # driver: 30000
+    MONGO_COMPRESSORS: str = ""  # comma-separated, e.g. "zstd,snappy,zlib" (zstd/snappy need extra packages)
+    MONGO_READ_PREFERENCE: Optional[str] = None  # primary, primaryPreferred, secondary, secondaryPreferred, nearest
+    MONGO_POOL_METRICS: bool = True  # record connection pool events (see /stats/pool)
+    METRICS_ENABLED: bool = True  # per-route and per-Mongo-command timings, served at /metrics
+    INDEX_STARTUP_MODE: str = "verify"  # verify (background, read-only), sync (create missing, blocks startup) or off
 
     # --- JWT ---
     JWT_SECRET: str = Field(..., description="Secret key for signing JWT tokens")
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRE_MINUTES: int = 60
     JWT_EXPIRES_SECONDS: int = 3600  # Redundant, but kept for clarity
+    ADMIN_TOKEN_CACHE_SIZE: int = 1024  # verified admin tokens kept per worker
+    ADMIN_TOKEN_CACHE_TTL_SECONDS: float = 60.0  # re-verify (and re-check revocation) at least this often
 
     # --- Admin Bootstrap ---
     ADMIN_EMAIL: str = "admin@example.com"
     ADMIN_PASSWORD: str = "changeme"  # Change in production!
+    ADMIN_PASSWORD_HASH: str = ""  # bcrypt hash; when set, ADMIN_PASSWORD is ignored
+
+    # --- Admin login ---
+    BCRYPT_WORKERS: int = 2  # threads for bcrypt; caps the CPU logins can take from the event loop's process
+    LOGIN_MAX_CONCURRENT: int = 8  # verifications running or queued; beyond this, 503
+    LOGIN_QUEUE_TIMEOUT_SECONDS: float = 2.0  # longest wait for a verification slot
+    LOGIN_FREE_ATTEMPTS: int = 5  # failures per client IP before backoff starts
+    LOGIN_BACKOFF_BASE_SECONDS: float = 1.0  # doubles with each further failure
+    LOGIN_BACKOFF_MAX_SECONDS: float = 300.0
+    LOGIN_FAILURE_WINDOW_SECONDS: float = 900.0  # an IP's failure count is forgotten after this long
+
+    # --- Catalog cache ---
+    CATALOG_CACHE_TTL_SECONDS: float = 60.0
+    CATALOG_CACHE_MAX_PRODUCTS: int = 5000
+    CATALOG_CACHE_MAX_LISTINGS: int = 512
+
+    # --- Admin dashboard counters ---
+    STATS_CACHE_TTL_SECONDS: float = 30.0  # served fresh for this long, then refreshed in the background
+    STATS_CACHE_MAX_STALE_SECONDS: float = 300.0  # never serve counters older than this
+
+    # --- Admission control (per worker) ---
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_MAX_CONCURRENT: int = 256  # requests in flight across all route groups
+    ADMISSION_CHECKOUT_RESERVE: int = 32  # of those, only cart/checkout may use the last this-many
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 2.0  # longest a request waits for a slot before 503
+    ADMISSION_TARGET_LATENCY_MS: float = 250.0  # catalog/checkout limits shrink above this mean latency, regrow below
+    ADMISSION_CATALOG_LIMIT: int = 192  # products, reviews, wishlist
+    ADMISSION_CATALOG_QUEUE: int = 256
+    ADMISSION_CHECKOUT_LIMIT: int = 64  # cart, checkout
+    ADMISSION_CHECKOUT_QUEUE: int = 128
+    ADMISSION_ADMIN_LIMIT: int = 16  # admin, stats, uploads, orders
+    ADMISSION_ADMIN_QUEUE: int = 32
+
+    # --- Client addresses ---
+    # Comma-separated IPs/CIDRs of the reverse proxies/load balancers in front of the app.
+    # Only requests arriving from one of these have X-Forwarded-For honoured; empty trusts none.
+    TRUSTED_PROXIES: str = ""
+
+    # --- Rate limiting (limits), per client IP and route group ---
+    # Off by default: behind a proxy every client shares its address until TRUSTED_PROXIES is set
+    RATE_LIMIT_ENABLED: bool = False
+    # e.g. redis://host:6379 to share counters across workers. Used through limits' async storages,
+    # so redis needs coredis installed (pip install "limits[async-redis]"); it isn't in requirements.txt.
+    RATE_LIMIT_STORAGE_URI: str = "memory://"
+    RATE_LIMIT_CATALOG: str = "600/minute"
+    RATE_LIMIT_CHECKOUT: str = "120/minute"
+    RATE_LIMIT_ADMIN: str = "300/minute"
+
+    # --- Responses ---
+    FAST_JSON: bool = False  # render hot product/order responses with a precompiled TypeAdapter
+
+    # --- Product search ---
+    SEARCH_ENGINE: str = "memory"  # memory (in-process inverted index) or mongo (text index)
+    SEARCH_INDEX_REFRESH_SECONDS: float = 300.0  # full rebuild interval, picks up other workers' writes
 
     # --- Cloudinary ---
     CLOUDINARY_CLOUD_NAME: str = Field(..., description="Cloudinary cloud name")
     CLOUDINARY_API_KEY: str = Field(..., description="Cloudinary API key")
     CLOUDINARY_API_SECRET: str = Field(..., description="Cloudinary API secret")
 
+    # --- Direct-to-Cloudinary uploads ---
+    CLOUDINARY_UPLOAD_FOLDER: str = "ecommerce-products"
+    CLOUDINARY_EAGER: str = "c_fill,w_400,h_400|c_limit,w_1600"  # derived sizes, generated asynchronously
+
+    # --- Image uploads ---
+    UPLOAD_BACKEND: str = "cloudinary"  # cloudinary, or local (offline stand-in for dev/tests/benchmarks)
+    UPLOAD_WORKERS: int = 8  # upload thread pool size, shared by all requests in a worker
+    UPLOAD_TIMEOUT_SECONDS: float = 30.0  # per image; also the SDK's network timeout
+    UPLOAD_LOCAL_DIR: str = "/tmp/uploads"
+    UPLOAD_LOCAL_BASE_URL: str = "http://localhost:8000/uploads/local"  # its path is where the app serves UPLOAD_LOCAL_DIR
+
     # --- App Info ---
     APP_NAME: str = "NabeeraBareera Store API"
     APP_ENV: str = "dev"  # dev, staging, prod
@@ -39,6 +116,7 @@ class Settings(BaseSettings):
 
     # --- Server ---
     PORT: int = 8000
+    ETAG_MAX_BYTES: int = 1_048_576  # JSON responses larger than this are streamed without an ETag
 
     # --- Email (Optional) ---
     EMAIL_USER: str = ""
@@ -3,6 +3,7 @@ from __future__ import annotations # Important for postponed evaluation of type
 from typing import Any
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from .config import settings
+from .utils.metrics import command_metrics, pool_metrics
 
 # Globals for lazy initialization
 # Using Python 3.10+ union syntax (Type | None) with __future__ annotations
@@ -11,6 +12,34 @@ _client: AsyncIOMotorClient | None = None # type: ignore
 _db: AsyncIOMotorDatabase | None = None # type: ignore
 
 
+def client_options() -> dict[str, Any]:
+    """
+    Pool, timeout, compression and read preference options from settings.
+    Only settings that are set are passed: keyword options override the same
+    option in MONGO_URI, so unset ones are left to the URI, then the driver.
+    """
+    options: dict[str, Any] = {"uuidRepresentation": "standard"}
+    for option, value in (
+        ("maxPoolSize", settings.MONGO_MAX_POOL_SIZE),
+        ("minPoolSize", settings.MONGO_MIN_POOL_SIZE),
+        ("maxIdleTimeMS", settings.MONGO_MAX_IDLE_TIME_MS),
+        ("serverSelectionTimeoutMS", settings.MONGO_SERVER_SELECTION_TIMEOUT_MS),
+        ("readPreference", settings.MONGO_READ_PREFERENCE),
+    ):
+        if value is not None:
+            options[option] = value
+    if settings.MONGO_COMPRESSORS:
+        options["compressors"] = settings.MONGO_COMPRESSORS
+    listeners = []
+    if settings.MONGO_POOL_METRICS:
+        listeners.append(pool_metrics)
+    if settings.METRICS_ENABLED:
+        listeners.append(command_metrics)
+    if listeners:
+        options["event_listeners"] = listeners
+    return options
+
+
 def get_client() -> AsyncIOMotorClient: # type: ignore
     """
     Returns a singleton instance of AsyncIOMotorClient.
@@ -18,7 +47,7 @@ def get_client() -> AsyncIOMotorClient: # type: ignore
     """
     global _client
     if _client is None:
-        _client = AsyncIOMotorClient(settings.MONGO_URI, uuidRepresentation="standard")
+        _client = AsyncIOMotorClient(settings.MONGO_URI, **client_options())
     return _client
 
 
@@ -2,11 +2,11 @@
 from __future__ import annotations
 from fastapi import Depends, HTTPException, status, Header
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from typing import Optional
+from typing import Any, Dict, Optional
 from .db import get_db
 from .config import settings
-from .security import verify_token
 from .utils.ids import ensure_str_id
+from .utils.token_cache import admin_tokens
 
 async def get_database() -> AsyncIOMotorDatabase: # type: ignore
     """
@@ -15,21 +15,58 @@ async def get_database() -> AsyncIOMotorDatabase: # type: ignore
     return get_db()
 
 
-async def get_admin_user(authorization: Optional[str] = Header(None)) -> str:
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+async def get_bearer_token(authorization: Optional[str] = Header(None)) -> str:
     """
-    Admin dependency — expects header: Authorization: Bearer <token>
-    Returns admin email string when valid; raises 401 otherwise.
+    The token from an `Authorization: Bearer <token>` header; raises 401 otherwise.
     """
     if not authorization:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing Authorization header")
+        raise _unauthorized("Missing Authorization header")
     parts = authorization.split()
     if len(parts) != 2 or parts[0].lower() != "bearer":
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid Authorization header")
-    token = parts[1]
-    sub = verify_token(token)
-    if not sub or sub != settings.ADMIN_EMAIL:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token or not admin")
-    return sub
+        raise _unauthorized("Invalid Authorization header")
+    return parts[1]
+
+
+def is_admin(payload: Dict[str, Any]) -> bool:
+    """
+    Admin tokens carry `role: "admin"`; tokens issued for the bootstrap
+    admin before roles existed are recognised by `sub == ADMIN_EMAIL`.
+    """
+    return payload.get("role") == "admin" or payload.get("sub") == settings.ADMIN_EMAIL
+
+
+async def get_admin_claims(
+    token: str = Depends(get_bearer_token),
+    db: AsyncIOMotorDatabase = Depends(get_database), # type: ignore
+) -> Dict[str, Any]:
+    """
+    Admin dependency — expects header: Authorization: Bearer <token>
+    Returns the verified token payload. Raises 401 for a missing, invalid,
+    expired or revoked token and 403 for a valid token without admin rights.
+    Verified tokens are cached (see utils/token_cache.py), so repeated
+    requests skip signature checks.
+    """
+    payload = await admin_tokens.verify(token, db)
+    if payload is None:
+        raise _unauthorized("Invalid or expired token")
+    if not is_admin(payload):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required.")
+    return payload
+
+
+async def get_admin_user(claims: Dict[str, Any] = Depends(get_admin_claims)) -> str:
+    """
+    Returns the admin's email (the token subject).
+    """
+    return claims.get("sub")
 
 
 async def get_optional_customer_token(x_customer_token: Optional[str] = Header(None)):
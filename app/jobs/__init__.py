@@ -0,0 +1,2 @@
+# app/jobs/__init__.py
+# One-shot maintenance commands, run with `python -m app.jobs.<name>`.
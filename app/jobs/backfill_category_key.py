@@ -0,0 +1,55 @@
+# app/jobs/backfill_category_key.py
+"""
+Backfill `category_key` on products written before it existed (or whose
+category was edited outside the API).
+
+    python -m app.jobs.backfill_category_key [--batch-size 500] [--dry-run]
+
+Safe to re-run: only documents whose stored key differs from the normalized
+category are rewritten.
+"""
+import argparse
+import asyncio
+from pymongo import UpdateOne
+from app.db import get_db, close_client
+from app.models.product import COLLECTION as PRODUCT_COLL, category_key
+
+
+async def backfill(db, batch_size: int = 500, dry_run: bool = False) -> int:
+    """
+    Returns the number of documents updated (or that would be, with dry_run).
+    """
+    pending = []
+    updated = 0
+    cursor = db[PRODUCT_COLL].find({}, {"metadata.category": 1, "category_key": 1}).batch_size(batch_size)
+    async for d in cursor:
+        key = category_key((d.get("metadata") or {}).get("category"))
+        if "category_key" in d and d["category_key"] == key:
+            continue
+        pending.append(UpdateOne({"_id": d["_id"]}, {"$set": {"category_key": key}}))
+        if len(pending) >= batch_size:
+            updated += len(pending)
+            if not dry_run:
+                await db[PRODUCT_COLL].bulk_write(pending, ordered=False)
+            pending = []
+    if pending:
+        updated += len(pending)
+        if not dry_run:
+            await db[PRODUCT_COLL].bulk_write(pending, ordered=False)
+    return updated
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Backfill products.category_key")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    try:
+        n = await backfill(get_db(), args.batch_size, args.dry_run)
+        print(f"{'Would update' if args.dry_run else 'Updated'} {n} product(s)")
+    finally:
+        await close_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
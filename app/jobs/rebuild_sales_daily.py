@@ -0,0 +1,80 @@
+# app/jobs/rebuild_sales_daily.py
+"""
+Rebuild the `sales_daily` rollup from the `orders` collection.
+
+    python -m app.jobs.rebuild_sales_daily [--from 2025-01-01] [--to 2025-01-31]
+
+Without a range every day is rebuilt. Days in the range that have no orders
+are removed from the rollup. Orders written before checkout stored `total`
+are counted through their legacy `total_amount` field.
+
+Each day is replaced in place ($merge whenMatched: replace), never deleted
+and re-inserted, so re-running is idempotent and days other than the one
+taking orders right now are exact. An order placed on the current day while
+the job runs can still be missed or counted twice; rebuild that day again
+once it is over. Needs MongoDB 5.0+ ($dateTrunc).
+"""
+import argparse
+import asyncio
+import datetime
+from typing import Optional
+from app.db import get_db, close_client
+from app.models.order import COLLECTION as ORDERS_COLL
+from app.models.sales import COLLECTION as SALES_COLL
+
+
+async def rebuild(db, start: Optional[datetime.date] = None, end: Optional[datetime.date] = None) -> int:
+    """
+    Returns the number of days written. `end` is inclusive.
+    """
+    match = {}
+    day_filter = {}
+    if start:
+        match.setdefault("created_at", {})["$gte"] = datetime.datetime.combine(start, datetime.time())
+        day_filter.setdefault("_id", {})["$gte"] = start.isoformat()
+    if end:
+        match.setdefault("created_at", {})["$lt"] = datetime.datetime.combine(end + datetime.timedelta(days=1), datetime.time())
+        day_filter.setdefault("_id", {})["$lte"] = end.isoformat()
+
+    # Days in range as they were before the rebuild; any of them the rebuild
+    # doesn't produce again have no orders left
+    before = {d["_id"]: d async for d in db[SALES_COLL].find(day_filter, {"revenue": 1, "orders_count": 1})}
+    stamp = datetime.datetime.utcnow()
+
+    pipeline = [
+        {"$match": match},
+        {
+            "$group": {
+                "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}},
+                "date": {"$min": {"$dateTrunc": {"date": "$created_at", "unit": "day"}}},
+                "revenue": {"$sum": {"$ifNull": ["$total", {"$ifNull": ["$total_amount", 0]}]}},
+                "orders_count": {"$sum": 1},
+            }
+        },
+        {"$set": {"rebuilt_at": stamp}},
+        {"$merge": {"into": SALES_COLL, "on": "_id", "whenMatched": "replace", "whenNotMatched": "insert"}},
+    ]
+    await db[ORDERS_COLL].aggregate(pipeline, allowDiskUse=True).to_list(length=None)
+
+    rebuilt = set(await db[SALES_COLL].distinct("_id", {**day_filter, "rebuilt_at": stamp}))
+    for day, doc in before.items():
+        if day not in rebuilt:
+            # only if checkout hasn't counted a new order on it meanwhile
+            await db[SALES_COLL].delete_one({"_id": day, "revenue": doc.get("revenue"), "orders_count": doc.get("orders_count")})
+    return len(rebuilt)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Rebuild the sales_daily rollup from orders")
+    parser.add_argument("--from", dest="start", type=datetime.date.fromisoformat)
+    parser.add_argument("--to", dest="end", type=datetime.date.fromisoformat)
+    args = parser.parse_args()
+    try:
+        n = await rebuild(get_db(), args.start, args.end)
+        print(f"Rebuilt {n} day(s) of sales")
+    finally:
+        await close_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
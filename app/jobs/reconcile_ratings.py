@@ -0,0 +1,80 @@
+# app/jobs/reconcile_ratings.py
+"""
+Recompute every product's `rating_stats` (sum, count, per-star histogram)
+from the `reviews` collection, repairing any drift in the incremental
+aggregates maintained by the review routes.
+
+    python -m app.jobs.reconcile_ratings [--batch-size 500]
+
+Products with a stored aggregate but no remaining reviews are reset to zero.
+Running workers pick up the repaired values within CATALOG_CACHE_TTL_SECONDS.
+
+A required pre-deploy migration (render.yaml runs it as the pre-deploy command):
+it gives every product an aggregate covering its full review history before
+the new code serves traffic. A product still missing one is seeded from its
+reviews on its next review change. Safe to re-run at any time.
+"""
+import argparse
+import asyncio
+from typing import Tuple
+from pymongo import UpdateOne
+from app.db import get_db, close_client
+from app.models.product import COLLECTION as PRODUCT_COLL, EMPTY_RATING_STATS
+from app.models.review import COLLECTION as REVIEWS_COLL, rating_stats_pipeline
+
+
+async def reconcile(db, batch_size: int = 500) -> Tuple[int, int]:
+    """
+    Returns (products with reviews, products whose stored aggregate was changed).
+    """
+    reviewed = 0
+    changed = 0
+    pending = []
+
+    async def flush():
+        nonlocal changed, pending
+        if pending:
+            res = await db[PRODUCT_COLL].bulk_write(pending, ordered=False)
+            changed += res.modified_count
+        pending = []
+
+    cursor = db[REVIEWS_COLL].aggregate(rating_stats_pipeline(), allowDiskUse=True)
+    async for row in cursor:
+        reviewed += 1
+        pending.append(UpdateOne({"_id": row["_id"]}, {"$set": {"rating_stats": row["rating_stats"]}}))
+        if len(pending) >= batch_size:
+            await flush()
+    await flush()
+
+    # Reset aggregates that still count reviews when none remain. Products are
+    # paged by _id so no query carries more than batch_size ids.
+    last_id = None
+    while True:
+        query = {"rating_stats.count": {"$gt": 0}}
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        ids = [d["_id"] for d in await db[PRODUCT_COLL].find(query, {"_id": 1}).sort("_id", 1).limit(batch_size).to_list(length=batch_size)]
+        if not ids:
+            break
+        last_id = ids[-1]
+        has_reviews = set(await db[REVIEWS_COLL].distinct("product_id", {"product_id": {"$in": ids}}))
+        orphaned = [i for i in ids if i not in has_reviews]
+        if orphaned:
+            res = await db[PRODUCT_COLL].update_many({"_id": {"$in": orphaned}}, {"$set": {"rating_stats": EMPTY_RATING_STATS}})
+            changed += res.modified_count
+    return reviewed, changed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Recompute products.rating_stats from reviews")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    try:
+        reviewed, changed = await reconcile(get_db(), args.batch_size)
+        print(f"{reviewed} reviewed product(s); {changed} aggregate(s) repaired")
+    finally:
+        await close_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,53 @@
+# app/jobs/sync_indexes.py
+"""
+Bring the database's indexes in line with the manifest in app/models/indexes.py.
+
+    python -m app.jobs.sync_indexes [--dry-run] [--usage] [--collection products ...]
+
+Creates missing indexes; reports (never drops) indexes that differ from their
+declaration or aren't declared at all. With --usage, also lists indexes with
+no operations since the server started ($indexStats), which are candidates
+for removal. Run it on deploy, before traffic moves to the new code.
+Exits 1 when drift remains, so CI can flag it.
+"""
+import argparse
+import asyncio
+import sys
+from app.db import get_db, close_client
+from app.models.indexes import MANIFEST, sync_indexes
+
+
+def print_report(reports, dry_run: bool) -> bool:
+    drifted = False
+    for r in reports:
+        lines = []
+        for model in r["missing"]:
+            lines.append(f"  {'would create' if dry_run else 'created'} {model.document['name']}")
+        for index_name, problems in r["drift"].items():
+            drifted = True
+            lines.append(f"  drift {index_name}: {'; '.join(problems)}")
+        for index_name in r["extra"]:
+            lines.append(f"  not in manifest: {index_name}")
+        for index_name in r["unused"]:
+            lines.append(f"  unused since server start: {index_name}")
+        print(f"{r['collection']}:" if lines else f"{r['collection']}: ok")
+        for line in lines:
+            print(line)
+    return drifted
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="Create missing indexes and report drift")
+    parser.add_argument("--dry-run", action="store_true", help="report only, create nothing")
+    parser.add_argument("--usage", action="store_true", help="also report indexes unused since server start")
+    parser.add_argument("--collection", action="append", choices=sorted(MANIFEST), help="limit to these collections")
+    args = parser.parse_args()
+    try:
+        reports = await sync_indexes(get_db(), args.dry_run, args.usage, args.collection)
+    finally:
+        await close_client()
+    return 1 if print_report(reports, args.dry_run) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
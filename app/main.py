@@ -1,5 +1,5 @@
 # app/main.py
-from fastapi import FastAPI, Request, Response
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .config import settings
 from .db import get_client, close_client, get_db
@@ -10,19 +10,32 @@ from .routers import (
     reviews,
     admin_products,
     admin_stats,
+    admin_auth,
     uploads,
     products,  
     orders,
+    metrics,
 )
-from .models import ensure_product_indexes, ensure_order_indexes, ensure_review_indexes, ensure_customer_indexes
+from .models import sync_indexes, verify_indexes
+import asyncio
+import os
 import uvicorn
-from .utils.etag import compute_etag
+from urllib.parse import urlparse
+from fastapi.staticfiles import StaticFiles
+from .utils.etag import ETagMiddleware
+from .utils.metrics import MetricsMiddleware
+from .utils.admission import AdmissionMiddleware
 import logging
 
 logger = logging.getLogger("uvicorn")
 
 app = FastAPI(title="Ecommerce Backend", version="0.1.0")
 
+# Per-group rate limits and concurrency caps; added first so it is innermost
+# and its 429/503 responses still get CORS headers and show up in metrics
+if settings.ADMISSION_ENABLED:
+    app.add_middleware(AdmissionMiddleware)
+
 # CORS — adjust in production
 app.add_middleware(
     CORSMiddleware,
@@ -32,6 +45,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Weak ETags + If-None-Match handling for JSON GETs
+app.add_middleware(ETagMiddleware, max_bytes=settings.ETAG_MAX_BYTES)
+
+# Per-route latency/status metrics; added last so it is outermost and times the whole stack
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # include routers
 
 app.include_router(products.router)  # 👈 mount new /products routes
@@ -41,8 +61,21 @@ app.include_router(checkout.router)
 app.include_router(reviews.router)
 app.include_router(admin_products.router)
 app.include_router(admin_stats.router, prefix="/stats")
+app.include_router(admin_auth.router)
 app.include_router(uploads.router)
 app.include_router(orders.router)
+if settings.METRICS_ENABLED:
+    app.include_router(metrics.router)
+# Deprecated root-level order paths; last, so its /{order_id} never shadows another route
+app.include_router(orders.legacy_router)
+
+# Files written by the offline upload backend, at the URLs it hands out
+if settings.UPLOAD_BACKEND == "local":
+    os.makedirs(settings.UPLOAD_LOCAL_DIR, exist_ok=True)
+    app.mount(urlparse(settings.UPLOAD_LOCAL_BASE_URL).path, StaticFiles(directory=settings.UPLOAD_LOCAL_DIR), name="local-uploads")
+
+
+_background_tasks = set()
 
 
 @app.on_event("startup")
@@ -50,12 +83,15 @@ async def startup():
     client = get_client()
     db = client[settings.MONGO_DB]
 
-    await ensure_product_indexes(db)
-    await ensure_order_indexes(db)
-    await ensure_review_indexes(db)
-    await ensure_customer_indexes(db)
-
-    logger.info("Connected to Mongo and ensured indexes.")
+    # Indexes are created by `python -m app.jobs.sync_indexes` at deploy time;
+    # by default a boot (e.g. a serverless cold start) only checks them in the background.
+    if settings.INDEX_STARTUP_MODE == "sync":
+        await sync_indexes(db)
+        logger.info("Connected to Mongo and ensured indexes.")
+    elif settings.INDEX_STARTUP_MODE == "verify":
+        task = asyncio.create_task(verify_indexes(db))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
 
 
 @app.on_event("shutdown")
@@ -63,47 +99,5 @@ async def shutdown():
     await close_client()
 
 
-@app.middleware("http")
-async def etag_middleware(request: Request, call_next):
-    response: Response = await call_next(request)
-
-    if request.method == "GET" and "application/json" in (response.headers.get("content-type") or ""):
-        body = b""
-        async for chunk in response.body_iterator:
-            body += chunk
-        try:
-            import json
-            payload = json.loads(body or b"{}")
-            etag = compute_etag(payload)
-            response.headers["ETag"] = etag
-        except Exception:
-            pass
-
-        # ✅ restore body with async iterator
-        async def body_iterator():
-            yield body
-
-        response.body_iterator = body_iterator()
-
-    return response
-
-    response: Response = await call_next(request)
-    # compute weak etag for GET responses with JSON
-    if request.method == "GET" and "application/json" in (response.headers.get("content-type") or ""):
-        body = b""
-        async for chunk in response.body_iterator:
-            body += chunk
-        try:
-            import json
-            payload = json.loads(body or b"{}")
-            etag = compute_etag(payload)
-            response.headers["ETag"] = etag
-        except Exception:
-            pass
-        # restore body
-        response.body_iterator = iter([body])
-    return response
-
-
 if __name__ == "__main__":
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
@@ -2,3 +2,6 @@ from .product import ensure_product_indexes
 from .order import ensure_order_indexes
 from .review import ensure_review_indexes
 from .customer import ensure_customer_indexes
+from .wishlist import ensure_wishlist_indexes
+from .cart import ensure_cart_indexes
+from .indexes import MANIFEST, sync_indexes, verify_indexes
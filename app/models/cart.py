@@ -1,13 +1,107 @@
 # app/models/cart.py
-from typing import Dict
+from typing import Dict, List
+from pymongo import IndexModel
+
 COLLECTION = "carts"
 
+# Index manifest, applied by `python -m app.jobs.sync_indexes` (see app/models/indexes.py)
+INDEXES = [
+    # One cart per session; every cart write is an upsert or update keyed on it
+    IndexModel("session_id", unique=True),
+]
+
+async def ensure_cart_indexes(db):
+    await db[COLLECTION].create_indexes(INDEXES)
+
 # a cart document:
 # {
 #   _id: ObjectId,
 #   session_id: str,  # can be a cookie or customer token
 #   items: [
-#       { product_id: ObjectId, quantity: int, price_at_add: float }
+#       { product_id: ObjectId, quantity: int, price_at_add: float }  # at most one line per product_id
 #   ],
+#   subtotal: float,  # sum of quantity * price_at_add, kept up to date by every write
+#   total_items: int,  # sum of quantity
+#   created_at: datetime,
 #   updated_at: datetime,
 # }
+
+_ITEMS = {"$ifNull": ["$items", []]}
+
+# Carts written before `subtotal`/`total_items` were stored get them computed once, on their next write
+_SUBTOTAL = {"$ifNull": ["$subtotal", {"$sum": {"$map": {"input": _ITEMS, "in": {"$multiply": ["$$this.quantity", "$$this.price_at_add"]}}}}]}
+_TOTAL_ITEMS = {"$ifNull": ["$total_items", {"$sum": "$items.quantity"}]}
+
+
+def _with_line(product_id) -> Dict:
+    # Stage exposing the product's current line (if any) as `_line` to the next stage
+    match = {"$filter": {"input": _ITEMS, "cond": {"$eq": ["$$this.product_id", product_id]}}}
+    return {"$set": {"_line": {"$arrayElemAt": [match, 0]}}}
+
+
+def _with_quantity(quantity) -> Dict:
+    # `$$this` line of a $map over items, with a new quantity
+    return {"product_id": "$$this.product_id", "quantity": quantity, "price_at_add": "$$this.price_at_add"}
+
+
+def _totals(quantity_delta, amount_delta, now) -> Dict:
+    return {
+        "subtotal": {"$round": [{"$add": [_SUBTOTAL, amount_delta]}, 2]},
+        "total_items": {"$add": [_TOTAL_ITEMS, quantity_delta]},
+        "updated_at": now,
+        "created_at": {"$ifNull": ["$created_at", now]},
+    }
+
+
+def add_item_pipeline(product_id, quantity: int, price: float, now) -> List[Dict]:
+    """
+    Update pipeline adding `quantity` of a product: bumps its line if the
+    cart has one (at that line's `price_at_add`), otherwise appends a line at
+    `price`. Adjusts `subtotal`/`total_items` by the difference only, so no
+    other line is re-priced. Works with upsert=True on a missing cart.
+    """
+    has_line = {"$in": [product_id, {"$ifNull": ["$items.product_id", []]}]}
+    return [
+        _with_line(product_id),
+        {
+            "$set": {
+                "items": {
+                    "$cond": [
+                        has_line,
+                        {"$map": {"input": _ITEMS, "in": {"$cond": [
+                            {"$eq": ["$$this.product_id", product_id]},
+                            _with_quantity({"$add": ["$$this.quantity", quantity]}),
+                            "$$this",
+                        ]}}},
+                        {"$concatArrays": [_ITEMS, [{"product_id": product_id, "quantity": quantity, "price_at_add": price}]]},
+                    ]
+                },
+                **_totals(quantity, {"$multiply": [quantity, {"$ifNull": ["$_line.price_at_add", price]}]}, now),
+            }
+        },
+        {"$project": {"_line": 0}},
+    ]
+
+
+def set_quantity_pipeline(product_id, quantity: int, now) -> List[Dict]:
+    """
+    Update pipeline setting a product's line to `quantity` (0 removes it),
+    adjusting `subtotal`/`total_items` by the change from the old line.
+    A product that isn't in the cart leaves the cart as it is.
+    """
+    old_quantity = {"$ifNull": ["$_line.quantity", 0]}
+    price = {"$ifNull": ["$_line.price_at_add", 0]}
+    if quantity:
+        items = {"$map": {"input": _ITEMS, "in": {"$cond": [
+            {"$eq": ["$$this.product_id", product_id]},
+            _with_quantity(quantity),
+            "$$this",
+        ]}}}
+    else:
+        items = {"$filter": {"input": _ITEMS, "cond": {"$ne": ["$$this.product_id", product_id]}}}
+    delta = {"$subtract": [quantity, old_quantity]}
+    return [
+        _with_line(product_id),
+        {"$set": {"items": items, **_totals(delta, {"$multiply": [delta, price]}, now)}},
+        {"$project": {"_line": 0}},
+    ]
@@ -1,10 +1,15 @@
 # app/models/customer.py
+import secrets
+from pymongo import IndexModel
+
 COLLECTION = "customers"
 
-async def ensure_customer_indexes(db):
-    await db[COLLECTION].create_index("name")
-    await db[COLLECTION].create_index("category")
-    
+# Index manifest, applied by `python -m app.jobs.sync_indexes` (see app/models/indexes.py)
+INDEXES = [
+    IndexModel("token", unique=True),
+    IndexModel("email"),
+]
+
 # customer doc:
 # {
 #   _id,
@@ -13,11 +18,8 @@ async def ensure_customer_indexes(db):
 #   created_at
 # }
 
-import secrets
-
 def generate_customer_token() -> str:
     return secrets.token_urlsafe(22)
 
 async def ensure_customer_indexes(db):
-    await db[COLLECTION].create_index("token", unique=True)
-    await db[COLLECTION].create_index("email")
+    await db[COLLECTION].create_indexes(INDEXES)
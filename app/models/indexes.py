@@ -0,0 +1,144 @@
+# app/models/indexes.py
+"""
+Declared indexes for every collection, gathered from each model module's
+`INDEXES`, and helpers to compare them with what the database has.
+
+`sync_indexes` creates what is missing (used by `python -m app.jobs.sync_indexes`
+and INDEX_STARTUP_MODE=sync); `verify_indexes` only reads and logs, which is
+what a normal startup does in the background.
+"""
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+from pymongo import IndexModel
+from pymongo.errors import OperationFailure
+from . import cart, customer, order, product, review, revoked_token, wishlist
+
+logger = logging.getLogger("uvicorn")
+
+MANIFEST: Dict[str, List[IndexModel]] = {
+    module.COLLECTION: module.INDEXES for module in (product, order, review, customer, wishlist, cart, revoked_token)
+}
+
+# Index options that change behaviour; anything else the server reports
+# (v, ns, textIndexVersion, ...) is ignored when comparing.
+_COMPARED_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression", "weights", "collation")
+
+
+def _key(spec) -> List[tuple]:
+    # IndexModel keys are SON, index_information() gives pairs; directions may come back as floats
+    pairs = spec.items() if hasattr(spec, "items") else spec
+    return [(field, int(d) if isinstance(d, (int, float)) else d) for field, d in pairs]
+
+
+def _is_text(key: List[tuple]) -> bool:
+    return any(d == "text" or field == "_fts" for field, d in key)
+
+
+def _options(info: Dict[str, Any]) -> Dict[str, Any]:
+    options = {k: info[k] for k in _COMPARED_OPTIONS if k in info}
+    if options.get("unique") is False:
+        del options["unique"]
+    return options
+
+
+def _diff(declared: Dict[str, Any], actual: Dict[str, Any]) -> List[str]:
+    problems = []
+    key = _key(declared["key"])
+    # the server stores text indexes as _fts/_ftsx plus weights, so compare the weights instead
+    if not _is_text(key) and _key(actual["key"]) != key:
+        problems.append(f"key {_key(actual['key'])} != {key}")
+    want, have = _options(declared), _options(actual)
+    for option in sorted(set(want) | set(have)):
+        if want.get(option) != have.get(option):
+            problems.append(f"{option} {have.get(option)!r} != {want.get(option)!r}")
+    return problems
+
+
+async def _usage(coll) -> Optional[Dict[str, int]]:
+    """Operations per index since the server last restarted, or None if $indexStats isn't available."""
+    try:
+        return {s["name"]: s["accesses"]["ops"] async for s in coll.aggregate([{"$indexStats": {}}])}
+    except (OperationFailure, NotImplementedError, KeyError):
+        return None
+
+
+async def check_collection(db, name: str, indexes: List[IndexModel], usage: bool = False) -> Dict[str, Any]:
+    """
+    Compare one collection's declared indexes with the live ones:
+    `missing` (IndexModels to create), `drift` ({name: [differences]}),
+    `extra` (live, undeclared index names) and, with usage=True, `unused`
+    (declared or live indexes with no operations since the server started).
+    """
+    coll = db[name]
+    live = await coll.index_information()
+    live.pop("_id_", None)
+    by_key = {tuple(_key(info["key"])): index_name for index_name, info in live.items()}
+    # a collection has at most one text index; its live key is _fts/_ftsx, never the declared fields
+    live_text = next((index_name for index_name, info in live.items() if _is_text(_key(info["key"]))), None)
+
+    report = {"collection": name, "missing": [], "drift": {}, "extra": [], "unused": []}
+    matched = set()
+    for model in indexes:
+        declared = model.document
+        index_name = declared["name"]
+        if index_name not in live:
+            # same keys under another name still serves the queries; report it instead of recreating.
+            # For text indexes a second one can't be created at all, so any existing one is the match
+            # (differing weights are reported as drift).
+            if _is_text(_key(declared["key"])):
+                index_name = live_text
+            else:
+                index_name = by_key.get(tuple(_key(declared["key"])))
+        if index_name is None:
+            report["missing"].append(model)
+            continue
+        matched.add(index_name)
+        problems = _diff(declared, live[index_name])
+        if index_name != declared["name"]:
+            problems.insert(0, f"named {index_name!r}, declared as {declared['name']!r}")
+        if problems:
+            report["drift"][index_name] = problems
+    report["extra"] = sorted(set(live) - matched)
+
+    if usage:
+        ops = await _usage(coll)
+        if ops is not None:
+            report["unused"] = sorted(n for n, count in ops.items() if n != "_id_" and count == 0)
+    return report
+
+
+async def check_indexes(db, usage: bool = False, collections: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    names = collections or list(MANIFEST)
+    return await asyncio.gather(*(check_collection(db, n, MANIFEST[n], usage) for n in names))
+
+
+async def sync_indexes(db, dry_run: bool = False, usage: bool = False, collections: Optional[List[str]] = None):
+    """
+    Create every missing index (all collections concurrently, one
+    `createIndexes` per collection). Drifted and extra indexes are only
+    reported; dropping or rebuilding them is left to a human.
+    """
+    reports = await check_indexes(db, usage, collections)
+    if not dry_run:
+        await asyncio.gather(*(
+            db[r["collection"]].create_indexes(r["missing"]) for r in reports if r["missing"]
+        ))
+    return reports
+
+
+async def verify_indexes(db) -> None:
+    """Read-only startup check: log missing or drifted indexes, never raise."""
+    try:
+        reports = await check_indexes(db)
+    except Exception:
+        logger.exception("Index verification failed")
+        return
+    for r in reports:
+        if r["missing"]:
+            names = ", ".join(m.document["name"] for m in r["missing"])
+            logger.warning(f"{r['collection']}: missing indexes {names}; run python -m app.jobs.sync_indexes")
+        for index_name, problems in r["drift"].items():
+            logger.warning(f"{r['collection']}.{index_name} differs from the manifest: {'; '.join(problems)}")
+    if not any(r["missing"] or r["drift"] for r in reports):
+        logger.info("Indexes match the manifest.")
@@ -2,24 +2,82 @@
 
 from datetime import datetime
 from bson import ObjectId
-from pymongo import ASCENDING
+from pymongo import ASCENDING, DESCENDING, IndexModel
 
 # just a string, not a db object
 COLLECTION = "orders"
 
+ORDER_STATUSES = ["pending", "processing", "ready-to-ship", "shipped", "delivered", "cancelled"]
+
+# Allowed status changes: fulfilment moves one step forward through
+# ORDER_STATUSES, and an order can be cancelled until it has shipped.
+ORDER_TRANSITIONS = {
+    "pending": ["processing", "cancelled"],
+    "processing": ["ready-to-ship", "cancelled"],
+    "ready-to-ship": ["shipped", "cancelled"],
+    "shipped": ["delivered"],
+    "delivered": [],
+    "cancelled": [],
+}
+
+# Index manifest, applied by `python -m app.jobs.sync_indexes` (see app/models/indexes.py)
+INDEXES = [
+    IndexModel([("user_id", ASCENDING)]),
+    IndexModel([("created_at", ASCENDING)]),
+    # order listing: newest first, optionally filtered by status or customer email
+    IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)]),
+    IndexModel([("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+    IndexModel([("customer.email", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+]
+
 async def ensure_order_indexes(db):
-    await db[COLLECTION].create_index([("user_id", ASCENDING)])
-    await db[COLLECTION].create_index([("created_at", ASCENDING)])
+    await db[COLLECTION].create_indexes(INDEXES)
 
-def doc_to_out(doc: dict) -> dict:
-    """
-    Convert MongoDB document to an API-friendly dict.
-    """
+# List view: everything but the item array, which is reduced to a count
+SUMMARY_PROJECTION = {
+    "order_number": 1,
+    "user_id": 1,
+    "customer.name": 1,
+    "customer.email": 1,
+    "status": 1,
+    "total": 1,
+    "total_amount": 1,
+    "backordered": 1,
+    "created_at": 1,
+    "item_count": {"$size": {"$ifNull": ["$items", []]}},
+}
+
+def _common_out(doc: dict) -> dict:
+    customer = doc.get("customer") or {}
+    created_at = doc.get("created_at", datetime.utcnow())
     return {
         "id": str(doc["_id"]),
-        "customer_name": doc.get("customer_name"),
-        "items": doc.get("items", []),
-        "total_price": doc.get("total_price"),
+        "order_number": doc.get("order_number"),
+        "user_id": str(doc["user_id"]) if doc.get("user_id") else None,
+        "customer_name": customer.get("name") or doc.get("customer_name"),
+        "email": customer.get("email") or doc.get("email"),
+        # checkout writes `total`; older documents may carry total_amount/total_price
+        "total_amount": doc.get("total", doc.get("total_amount", doc.get("total_price", 0))),
         "status": doc.get("status", "pending"),
-        "created_at": doc.get("created_at", datetime.utcnow()),
+        "backordered": [str(pid) for pid in doc.get("backordered", [])],
+        "created_at": created_at.isoformat() if isinstance(created_at, datetime) else created_at,
     }
+
+def doc_to_out(doc: dict) -> dict:
+    """
+    Convert MongoDB document to an API-friendly dict.
+    """
+    out = _common_out(doc)
+    out["items"] = [
+        {**it, "product_id": str(it["product_id"])} if isinstance(it.get("product_id"), ObjectId) else it
+        for it in doc.get("items", [])
+    ]
+    return out
+
+def doc_to_summary(doc: dict) -> dict:
+    """
+    Convert a document read with SUMMARY_PROJECTION to the list-view dict.
+    """
+    out = _common_out(doc)
+    out["item_count"] = doc.get("item_count", 0)
+    return out
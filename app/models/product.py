@@ -1,13 +1,91 @@
 # app/models/product.py
 from typing import Optional, List, Dict
 from bson import ObjectId
+from pymongo import IndexModel
 
 COLLECTION = "products"
 
+# Index manifest, applied by `python -m app.jobs.sync_indexes` (see app/models/indexes.py)
+INDEXES = [
+    IndexModel("title"),
+    IndexModel("on_sale"),
+    # keyset pagination: listings sort on created_at desc, _id desc
+    IndexModel([("created_at", -1), ("_id", -1)]),
+    # category listings, with and without the subcategories $in
+    IndexModel([("category_key", 1), ("created_at", -1), ("_id", -1)]),
+    IndexModel([("category_key", 1), ("metadata.subcategories", 1), ("created_at", -1), ("_id", -1)]),
+    # full-text search (SEARCH_ENGINE=mongo); weights match app/utils/search.py
+    IndexModel(
+        [("name", "text"), ("description", "text"), ("metadata.category", "text"), ("metadata.subcategories", "text")],
+        weights={"name": 10, "metadata.category": 5, "metadata.subcategories": 3, "description": 1},
+        name="product_text",
+    ),
+]
+
 async def ensure_product_indexes(db):
-    await db[COLLECTION].create_index("title")
-    await db[COLLECTION].create_index("on_sale")
-    await db[COLLECTION].create_index([("metadata.category", 1)])
+    await db[COLLECTION].create_indexes(INDEXES)
+
+def category_key(category: Optional[str]) -> Optional[str]:
+    """
+    Normalized form of `metadata.category` stored alongside it as `category_key`,
+    so category filters are exact, indexable equality matches.
+    """
+    if not category:
+        return None
+    return category.strip().casefold()
+
+# Fields needed to price a line item (cart/checkout). Keep this small so the
+# batched `$in` lookups don't drag descriptions and image arrays over the wire.
+PRICING_PROJECTION = {"name": 1, "title": 1, "price": 1, "sale_price": 1, "on_sale": 1, "stock": 1}
+
+def effective_price(d: Dict) -> float:
+    """
+    Returns the price a customer pays for the product right now:
+    the sale price when the product is on sale and has one, otherwise the list price.
+    """
+    if d.get("on_sale") and d.get("sale_price"):
+        return float(d["sale_price"])
+    return float(d.get("price") or 0)
+
+EMPTY_RATING_STATS = {"sum": 0, "count": 0, "hist": {}}
+
+def rating_update(rating: int, delta: int, seed: Optional[Dict] = None) -> List[Dict]:
+    """
+    Update pipeline applying one review (delta=1) or its removal (delta=-1) to
+    the product's `rating_stats` aggregate: {sum, count, hist: {"1".."5": n}}.
+
+    A product without an aggregate yet starts from `seed`, its stats before
+    this change as counted from the reviews collection. Without a seed, only
+    use it on products that have an aggregate (filter on `rating_stats`).
+    Counters never go below zero.
+    """
+    def bumped(path: str, by: int) -> Dict:
+        return {"$max": [0, {"$add": [{"$ifNull": [f"${path}", 0]}, by]}]}
+
+    stages = []
+    if seed is not None:
+        stages.append({"$set": {"rating_stats": {"$ifNull": ["$rating_stats", seed]}}})
+    stages.append({
+        "$set": {
+            "rating_stats.sum": bumped("rating_stats.sum", rating * delta),
+            "rating_stats.count": bumped("rating_stats.count", delta),
+            f"rating_stats.hist.{rating}": bumped(f"rating_stats.hist.{rating}", delta),
+        }
+    })
+    return stages
+
+def rating_summary(stats: Optional[Dict]) -> Dict:
+    """
+    Average/count/distribution derived from a `rating_stats` aggregate.
+    """
+    stats = stats or {}
+    count = stats.get("count", 0)
+    hist = stats.get("hist", {})
+    return {
+        "average_rating": round(stats.get("sum", 0) / count, 1) if count > 0 else 0,
+        "total_reviews": count,
+        "rating_distribution": {i: hist.get(str(i), 0) for i in range(5, 0, -1)},
+    }
 
 def doc_to_out(d: Dict) -> Dict:
     """
@@ -19,6 +97,11 @@ def doc_to_out(d: Dict) -> Dict:
     It assumes that all details except the image URLs are stored directly
     in the MongoDB document.
     """
+    metadata = d.get("metadata", {})
+    if d.get("rating_stats"):
+        # rating/reviews are derived from the review aggregate once one exists
+        summary = rating_summary(d["rating_stats"])
+        metadata = {**metadata, "rating": summary["average_rating"], "reviews": summary["total_reviews"]}
     out = {
         # The '_id' field from the document is mapped to the 'id' field in the API response.
         "id": str(d.get("_id")),
@@ -33,7 +116,7 @@ def doc_to_out(d: Dict) -> Dict:
         "stock": d.get("stock", 0),
         # 'inStock' is derived from the 'stock' field.
         "inStock": d.get("stock", 0) > 0,
-        "metadata": d.get("metadata", {}),
+        "metadata": metadata,
         # The 'category' is retrieved from the metadata.
         "category": d.get("metadata", {}).get("category"),
         # 'subcategories' is also retrieved from the metadata.
@@ -1,21 +1,29 @@
 # app/models/review.py
+from typing import Dict, List, Optional
+from pymongo import IndexModel
+
 COLLECTION = "reviews"
 
+# Index manifest, applied by `python -m app.jobs.sync_indexes` (see app/models/indexes.py)
+INDEXES = [
+    # Index on product_id for fast lookups of reviews by product
+    IndexModel("product_id"),
+
+    # Index on created_at (+ _id tiebreak) for keyset-paginating all reviews by date
+    IndexModel([("created_at", -1), ("_id", -1)]),
+
+    # Compound index for product_id + created_at (+ _id tiebreak) for paginated product review queries
+    IndexModel([("product_id", 1), ("created_at", -1), ("_id", -1)]),
+
+    # Index on rating for statistics queries
+    IndexModel("rating"),
+]
+
 async def ensure_review_indexes(db):
     """
     Create indexes for the reviews collection to optimize queries.
     """
-    # Index on product_id for fast lookups of reviews by product
-    await db[COLLECTION].create_index("product_id")
-    
-    # Index on created_at for sorting reviews by date
-    await db[COLLECTION].create_index("created_at")
-    
-    # Compound index for product_id + created_at for efficient product review queries
-    await db[COLLECTION].create_index([("product_id", 1), ("created_at", -1)])
-    
-    # Index on rating for statistics queries
-    await db[COLLECTION].create_index("rating")
+    await db[COLLECTION].create_indexes(INDEXES)
 
 # Review document structure:
 # {
@@ -25,4 +33,24 @@ async def ensure_review_indexes(db):
 #   rating: int,           # Rating from 1 to 5
 #   comment: str,          # Review text
 #   created_at: datetime   # When the review was created
-# }
\ No newline at end of file
+# }
+
+
+def rating_stats_pipeline(match: Optional[Dict] = None) -> List[Dict]:
+    """
+    reviews -> one {_id: product_id, rating_stats: {sum, count, hist}} per
+    reviewed product, optionally restricted by `match`.
+    """
+    stages = [{"$match": match}] if match else []
+    return stages + [
+        {"$group": {"_id": {"product_id": "$product_id", "rating": "$rating"}, "n": {"$sum": 1}}},
+        {
+            "$group": {
+                "_id": "$_id.product_id",
+                "sum": {"$sum": {"$multiply": ["$_id.rating", "$n"]}},
+                "count": {"$sum": "$n"},
+                "hist": {"$push": {"k": {"$toString": "$_id.rating"}, "v": "$n"}},
+            }
+        },
+        {"$project": {"rating_stats": {"sum": "$sum", "count": "$count", "hist": {"$arrayToObject": "$hist"}}}},
+    ]
\ No newline at end of file
@@ -0,0 +1,17 @@
+# app/models/revoked_token.py
+from pymongo import IndexModel
+
+COLLECTION = "revoked_tokens"
+
+# Index manifest, applied by `python -m app.jobs.sync_indexes` (see app/models/indexes.py)
+INDEXES = [
+    # Mongo deletes each entry once the token it blocks has expired anyway
+    IndexModel("expires_at", expireAfterSeconds=0),
+]
+
+# revoked token doc:
+# {
+#   _id: str,  # sha256 hex digest of the token; the token itself is never stored
+#   expires_at: datetime,  # the token's exp (UTC)
+#   revoked_at: datetime,
+# }
@@ -0,0 +1,29 @@
+# app/models/sales.py
+import datetime
+
+# Materialized per-day sales rollup, maintained by checkout and rebuilt by
+# `python -m app.jobs.rebuild_sales_daily`.
+COLLECTION = "sales_daily"
+
+# sales_daily doc:
+# {
+#   _id: "YYYY-MM-DD",     # UTC day; sorts and range-queries as a string
+#   date: datetime,        # midnight UTC of that day
+#   revenue: float,
+#   orders_count: int,
+#   rebuilt_at: datetime,  # set by the rebuild job; absent on days only checkout has written
+# }
+
+def day_key(dt: datetime.datetime) -> str:
+    return dt.strftime("%Y-%m-%d")
+
+
+def rollup_update(created_at: datetime.datetime, total: float) -> tuple:
+    """
+    (filter, update) adding one order to its day's rollup; use with upsert=True.
+    """
+    midnight = datetime.datetime(created_at.year, created_at.month, created_at.day)
+    return (
+        {"_id": day_key(created_at)},
+        {"$inc": {"revenue": total, "orders_count": 1}, "$setOnInsert": {"date": midnight}},
+    )
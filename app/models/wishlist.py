@@ -1,10 +1,51 @@
 # app/models/wishlist.py
+from pymongo import IndexModel
+
 COLLECTION = "wishlists"
 
+# Index manifest, applied by `python -m app.jobs.sync_indexes` (see app/models/indexes.py)
+INDEXES = [
+    # One wishlist per owner; upserts rely on this to never create a second doc
+    IndexModel("owner", unique=True),
+]
+
+async def ensure_wishlist_indexes(db):
+    await db[COLLECTION].create_indexes(INDEXES)
+
 # wishlist doc:
 # {
 #   _id,
 #   owner: str,  # either admin id or customer token or session cookie id
-#   items: [{product_id, added_at}],
+#   items: [{product_id, added_at}],  # at most one entry per product_id
 #   created_at
 # }
+
+
+def add_item_pipeline(product_id, now):
+    """
+    Update pipeline that appends {product_id, added_at} unless the product is
+    already in `items`, so repeated adds keep the original entry. Works with
+    upsert=True on a missing wishlist.
+    """
+    items = {"$ifNull": ["$items", []]}
+    return [
+        {
+            "$set": {
+                "items": {
+                    "$cond": [
+                        {"$in": [product_id, {"$ifNull": ["$items.product_id", []]}]},
+                        items,
+                        {"$concatArrays": [items, [{"product_id": product_id, "added_at": now}]]},
+                    ]
+                },
+                "created_at": {"$ifNull": ["$created_at", now]},
+            }
+        }
+    ]
+
+
+def item_ids(doc):
+    """Product id strings in the wishlist, first occurrence wins (older docs may hold duplicates)."""
+    if not doc:
+        return []
+    return list(dict.fromkeys(str(it["product_id"]) for it in doc.get("items", [])))
@@ -0,0 +1,89 @@
+# app/routers/admin_auth.py
+import asyncio
+import hmac
+import math
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from ..config import settings
+from ..deps import get_admin_claims, get_bearer_token, get_database
+from ..schemas.admin import AdminLogin, AdminToken
+from ..security import hash_password_async, verify_password_async
+from ..utils.client_ip import client_ip
+from ..utils.jwt import create_access_token
+from ..utils.login_throttle import Saturated, admin_login_throttle
+from ..utils.token_cache import admin_tokens
+
+router = APIRouter(prefix="/admin", tags=["admin-auth"])
+
+_admin_hash: Optional[str] = settings.ADMIN_PASSWORD_HASH or None
+_admin_hash_lock = asyncio.Lock()
+
+
+async def _admin_password_hash() -> str:
+    # Without ADMIN_PASSWORD_HASH, hash ADMIN_PASSWORD once (off the loop) on first login
+    global _admin_hash
+    if _admin_hash is None:
+        async with _admin_hash_lock:
+            if _admin_hash is None:
+                _admin_hash = await hash_password_async(settings.ADMIN_PASSWORD)
+    return _admin_hash
+
+
+@router.post("/login", response_model=AdminToken)
+async def login(payload: AdminLogin, request: Request):
+    """
+    Exchange the admin email and password for a bearer token.
+
+    bcrypt runs on a small dedicated thread pool, never on the event loop,
+    and at most LOGIN_MAX_CONCURRENT verifications run or wait at once
+    (503 beyond that). After LOGIN_FREE_ATTEMPTS failures a client IP (see
+    TRUSTED_PROXIES) is locked out for an exponentially growing time (429
+    with Retry-After), without any bcrypt work being done for it.
+    """
+    ip = client_ip(request.scope)
+    # Counted as a failure from here on, until the password checks out
+    wait = admin_login_throttle.attempt(ip)
+    if wait > 0:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many failed login attempts. Try again later.",
+            headers={"Retry-After": str(math.ceil(wait))},
+        )
+
+    try:
+        async with admin_login_throttle.slot():
+            password_ok = await verify_password_async(payload.password, await _admin_password_hash())
+    except Saturated:
+        admin_login_throttle.refund(ip)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Login is busy. Try again shortly.",
+            headers={"Retry-After": "1"},
+        )
+
+    # The password is always checked, so an unknown email takes as long as a wrong password
+    email_ok = hmac.compare_digest(payload.email.strip().casefold().encode(), settings.ADMIN_EMAIL.casefold().encode())
+    if not (password_ok and email_ok):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid email or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    admin_login_throttle.succeeded(ip)
+    token = create_access_token({"sub": settings.ADMIN_EMAIL, "role": "admin"})
+    return {"access_token": token, "token_type": "bearer", "expires_in": settings.JWT_EXPIRE_MINUTES * 60}
+
+
+@router.post("/logout")
+async def logout(
+    token: str = Depends(get_bearer_token),
+    claims: Dict[str, Any] = Depends(get_admin_claims),
+    db=Depends(get_database),
+):
+    """
+    Revoke the presented admin token. It is rejected at once by this worker
+    and by others within ADMIN_TOKEN_CACHE_TTL_SECONDS.
+    """
+    await admin_tokens.revoke(token, claims, db)
+    return {"ok": True}
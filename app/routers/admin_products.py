@@ -2,7 +2,8 @@
 from fastapi import APIRouter, Depends, HTTPException
 from ..deps import get_database, get_admin_user
 from ..schemas.product import ProductCreate, ProductUpdate
-from ..models.product import COLLECTION as PRODUCT_COLL, doc_to_out
+from ..models.product import COLLECTION as PRODUCT_COLL, doc_to_out, category_key
+from ..utils import catalog_cache, search
 from bson import ObjectId
 import datetime
 
@@ -13,7 +14,7 @@ router = APIRouter(prefix="/admin/products", tags=["admin_products"])
 async def create_product(payload: ProductCreate, db=Depends(get_database)):
     now = datetime.datetime.utcnow()
     doc = {
-        "title": payload.title,
+        "name": payload.name,
         "description": payload.description,
         "price": payload.price,
         "sale_price": None,
@@ -21,10 +22,13 @@ async def create_product(payload: ProductCreate, db=Depends(get_database)):
         "images": payload.images or [],
         "stock": payload.stock,
         "metadata": payload.metadata or {},
+        "category_key": category_key((payload.metadata or {}).get("category")),
         "created_at": now,
         "updated_at": now,
     }
     res = await db[PRODUCT_COLL].insert_one(doc)
+    catalog_cache.invalidate_product(res.inserted_id)
+    search.index_product(doc)
     return {"id": str(res.inserted_id)}
 
 
@@ -35,9 +39,15 @@ async def update_product(product_id: str, payload: ProductUpdate, db=Depends(get
     update = {k: v for k, v in payload.dict(exclude_unset=True).items()}
     if "on_sale" in update and update.get("on_sale") is False:
         update["sale_price"] = None
+    if "metadata" in update:
+        update["category_key"] = category_key((update["metadata"] or {}).get("category"))
     update["updated_at"] = datetime.datetime.utcnow()
     await db[PRODUCT_COLL].update_one({"_id": ObjectId(product_id)}, {"$set": update})
+    catalog_cache.invalidate_product(product_id)
     doc = await db[PRODUCT_COLL].find_one({"_id": ObjectId(product_id)})
+    if not doc:
+        raise HTTPException(status_code=404, detail="Product not found")
+    search.index_product(doc)
     return doc_to_out(doc)
 
 
@@ -46,4 +56,6 @@ async def delete_product(product_id: str, db=Depends(get_database)):
     if not ObjectId.is_valid(product_id):
         raise HTTPException(status_code=400, detail="Invalid product id")
     await db[PRODUCT_COLL].delete_one({"_id": ObjectId(product_id)})
+    catalog_cache.invalidate_product(product_id)
+    search.unindex_product(product_id)
     return {"ok": True}
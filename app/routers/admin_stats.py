@@ -1,49 +1,74 @@
 from __future__ import annotations
-from datetime import datetime, timedelta
-from typing import Annotated
+import asyncio
+from datetime import date, datetime, timedelta
+from typing import Annotated, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status, Header
+from fastapi import APIRouter, Depends, HTTPException, Query
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from app.db import get_db
-from app.utils.jwt import decode_access_token
+from app.config import settings
+from app.deps import get_admin_user
+from app.utils.catalog_cache import cache_stats
+from app.utils.metrics import pool_metrics
+from app.utils.admission import admission
+from app.utils.cache import RefreshingValue
+from app.models.sales import COLLECTION as SALES_COLL, day_key
+from app.models.product import COLLECTION as PRODUCT_COLL
+from app.models.order import COLLECTION as ORDERS_COLL
+from app.models.customer import COLLECTION as CUSTOMERS_COLL
+
+MAX_SALES_RANGE_DAYS = 3660
 
 # --- Reusable Dependency ---
 # Create a type alias for the database dependency. This helps with static analysis
 # and keeps the code DRY (Don't Repeat Yourself).
 DBDep = Annotated[AsyncIOMotorDatabase, Depends(get_db)]
 
-# --- Dependency to enforce admin-only access ---
-async def get_current_admin(
-    authorization: Annotated[str, Header()],
-    db: DBDep,
-):
+router = APIRouter(
+    tags=["admin-stats"],
+    dependencies=[Depends(get_admin_user)],
+)
+
+# The dependency is already applied at the router level above.
+
+async def _load_dashboard_summary(db: AsyncIOMotorDatabase) -> dict:
     """
-    Extracts Bearer token from Authorization header and validates admin.
+    Gather all dashboard counters concurrently. Collection totals use
+    collection metadata (`estimated_document_count`) instead of scanning;
+    only the figures that must be exact are counted.
     """
-    try:
-        if not authorization.startswith("Bearer "):
-            raise ValueError("Invalid auth header format")
-        token = authorization.split(" ")[1]
-        payload = decode_access_token(token)
-        if payload.get("role") != "admin":
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Admin privileges required.",
-            )
-        return payload
-    except Exception:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or missing token.",
-        )
+    today = datetime.utcnow()
+    users, products, orders, customers, pending_orders, today_sales = await asyncio.gather(
+        db["users"].estimated_document_count(),
+        db[PRODUCT_COLL].estimated_document_count(),
+        db[ORDERS_COLL].estimated_document_count(),
+        db[CUSTOMERS_COLL].estimated_document_count(),
+        db[ORDERS_COLL].count_documents({"status": "pending"}),
+        db[SALES_COLL].find_one({"_id": day_key(today)}),
+    )
+    today_sales = today_sales or {}
+    return {
+        "users": users,
+        "products": products,
+        "orders": orders,
+        "customers": customers,
+        "pending_orders": pending_orders,
+        "today": {
+            "date": day_key(today),
+            "total_sales": today_sales.get("revenue", 0),
+            "orders_count": today_sales.get("orders_count", 0),
+        },
+        "generated_at": today.isoformat(),
+    }
 
 
-router = APIRouter(
-    tags=["admin-stats"],
-    dependencies=[Depends(get_current_admin)],
+# Shared by every admin polling the dashboard in this worker
+dashboard_summary = RefreshingValue(
+    _load_dashboard_summary,
+    ttl=settings.STATS_CACHE_TTL_SECONDS,
+    max_stale=settings.STATS_CACHE_MAX_STALE_SECONDS,
 )
 
-# The dependency is already applied at the router level above.
 
 @router.get("/")
 async def get_admin_stats(
@@ -52,55 +77,92 @@ async def get_admin_stats(
     """
     Return basic stats for admin dashboard.
     """
-    users_count = await db["users"].count_documents({})
-    products_count = await db["products"].count_documents({})
-    orders_count = await db["orders"].count_documents({})
-
+    summary = await dashboard_summary.get(db)
     return {
-        "users": users_count,
-        "products": products_count,
-        "orders": orders_count,
+        "users": summary["users"],
+        "products": summary["products"],
+        "orders": summary["orders"],
     }
 
 
+@router.get("/summary")
+async def get_dashboard_summary(
+    db: DBDep,
+):
+    """
+    Dashboard counters, served from a short-lived per-worker cache that is
+    refreshed in the background (see STATS_CACHE_* settings). Totals are
+    estimates from collection metadata; `pending_orders` is exact.
+    """
+    return await dashboard_summary.get(db)
+
+
 @router.get("/sales/daily")
 async def get_daily_sales(
     db: DBDep,
+    from_: Annotated[Optional[date], Query(alias="from")] = None,
+    to: Annotated[Optional[date], Query()] = None,
 ):
     """
-    Returns total sales for the last 7 days (grouped by date).
-    Expects `orders` collection to have:
-      - `created_at`: datetime
-      - `total_amount`: number
+    Returns total sales per UTC day for an inclusive date range
+    (default: the last 7 days), read from the `sales_daily` rollup so the
+    cost depends on the number of days, not the number of orders.
     """
-    seven_days_ago = datetime.utcnow() - timedelta(days=7)
-
-    pipeline = [
-        {"$match": {"created_at": {"$gte": seven_days_ago}}},
-        {
-            "$group": {
-                "_id": {
-                    "year": {"$year": "$created_at"},
-                    "month": {"$month": "$created_at"},
-                    "day": {"$dayOfMonth": "$created_at"},
-                },
-                "total_sales": {"$sum": "$total_amount"},
-                "orders_count": {"$sum": 1},
-            }
-        },
-        {"$sort": {"_id": 1}},
-    ]
-
-    results = await db["orders"].aggregate(pipeline).to_list(length=None)
-
-    # Format results nicely
-    daily_sales = [
-        {
-            "date": f"{r['_id']['year']}-{r['_id']['month']:02d}-{r['_id']['day']:02d}",
-            "total_sales": r["total_sales"],
-            "orders_count": r["orders_count"],
-        }
-        for r in results
-    ]
-
-    return {"last_7_days": daily_sales}
+    end = to or datetime.utcnow().date()
+    start = from_ or end - timedelta(days=6)
+    if start > end:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    if (end - start).days >= MAX_SALES_RANGE_DAYS:
+        raise HTTPException(status_code=400, detail=f"Date range is limited to {MAX_SALES_RANGE_DAYS} days")
+
+    cursor = db[SALES_COLL].find({"_id": {"$gte": start.isoformat(), "$lte": end.isoformat()}})
+    by_day = {d["_id"]: d async for d in cursor}
+
+    # Every day in the range, zero-filled
+    daily_sales = []
+    for n in range((end - start).days + 1):
+        day = (start + timedelta(days=n)).isoformat()
+        d = by_day.get(day, {})
+        daily_sales.append({
+            "date": day,
+            "total_sales": d.get("revenue", 0),
+            "orders_count": d.get("orders_count", 0),
+        })
+
+    out = {
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "daily_sales": daily_sales,
+        "total_sales": sum(d["total_sales"] for d in daily_sales),
+        "orders_count": sum(d["orders_count"] for d in daily_sales),
+    }
+    if from_ is None and to is None:
+        out["last_7_days"] = daily_sales  # original response key
+    return out
+
+
+@router.get("/cache")
+async def get_cache_stats():
+    """
+    Hit/miss/eviction counters for the in-process catalog cache (per worker).
+    """
+    return cache_stats()
+
+
+@router.get("/pool")
+async def get_pool_stats():
+    """
+    MongoDB connection pool counters per server (per worker): connections
+    created/open, currently checked out and waiting, and checkout wait times.
+    Empty when MONGO_POOL_METRICS is off.
+    """
+    return pool_metrics.snapshot()
+
+
+@router.get("/admission")
+async def get_admission_stats():
+    """
+    Admission control per route group (per worker): current concurrency limit
+    and in-flight/queued requests, plus requests shed (503) or rate limited (429).
+    """
+    return admission.stats()
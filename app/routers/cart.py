@@ -1,53 +1,115 @@
 # app/routers/cart.py
 from fastapi import APIRouter, Depends, HTTPException
-from ..deps import get_database
-from ..models.cart import COLLECTION as CART_COLL
-from ..models.product import COLLECTION as PRODUCT_COLL, doc_to_out
-from ..schemas.cart import CartCreate, CartResponse
+from pymongo import ReturnDocument
 from bson import ObjectId
+from ..deps import get_database
+from ..models.cart import COLLECTION as CART_COLL, add_item_pipeline, set_quantity_pipeline
+from ..utils.pricing import price_items
+from ..schemas.cart import CartCreate, CartItemAdd, CartItemQuantity, CartResponse
 import datetime
 
 router = APIRouter(prefix="/cart", tags=["cart"])
 
+# Everything a response is built from
+CART_PROJECTION = {"_id": 0, "items": 1, "subtotal": 1, "total_items": 1}
+
+
+def _cart_response(session_id: str, doc) -> dict:
+    if not doc:
+        return {"session_id": session_id, "items": [], "total_items": 0, "subtotal": 0.0}
+    lines = doc.get("items", [])
+    items = [{"product_id": str(it["product_id"]), "quantity": it["quantity"], "price_at_add": it["price_at_add"]} for it in lines]
+    # Carts written before the totals were stored don't have them yet
+    subtotal = doc.get("subtotal")
+    if subtotal is None:
+        subtotal = sum(it["quantity"] * it["price_at_add"] for it in lines)
+    total_items = doc.get("total_items")
+    if total_items is None:
+        total_items = sum(it["quantity"] for it in lines)
+    return {"session_id": session_id, "items": items, "total_items": total_items, "subtotal": subtotal}
+
+
+def _object_id(product_id: str) -> ObjectId:
+    if not ObjectId.is_valid(product_id):
+        raise HTTPException(status_code=400, detail="Invalid product id")
+    return ObjectId(product_id)
+
 
 @router.post("/upsert", response_model=CartResponse)
 async def upsert_cart(payload: CartCreate, db=Depends(get_database)):
     session_id = payload.session_id
-    # Normalize items and validate product ids
-    items = []
-    subtotal = 0.0
-    for it in payload.items:
-        pid = it.product_id
-        if not ObjectId.is_valid(pid):
-            raise HTTPException(status_code=400, detail=f"Invalid product id: {pid}")
-        prod = await db[PRODUCT_COLL].find_one({"_id": ObjectId(pid)})
-        if not prod:
-            raise HTTPException(status_code=404, detail=f"Product {pid} not found")
-        price = prod.get("sale_price") if prod.get("on_sale") and prod.get("sale_price") else prod.get("price")
-        items.append({"product_id": ObjectId(pid), "quantity": int(it.quantity), "price_at_add": float(price)})
-        subtotal += float(price) * int(it.quantity)
+    # Validate and price every line with a single batched product lookup
+    lines = await price_items(db, payload.items)
+    # One line per product (the item endpoints rely on it): repeats are merged
+    merged = {}
+    for ln in lines:
+        if ln["product_id"] in merged:
+            merged[ln["product_id"]]["quantity"] += ln["quantity"]
+        else:
+            merged[ln["product_id"]] = {"product_id": ln["product_id"], "quantity": ln["quantity"], "price_at_add": ln["price"]}
+    items = list(merged.values())
+    subtotal = round(sum(it["price_at_add"] * it["quantity"] for it in items), 2)
+    total_items = sum(it["quantity"] for it in items)
 
     now = datetime.datetime.utcnow()
     await db[CART_COLL].update_one(
         {"session_id": session_id},
-        {"$set": {"items": items, "updated_at": now}, "$setOnInsert": {"created_at": now}},
+        {
+            "$set": {"items": items, "subtotal": subtotal, "total_items": total_items, "updated_at": now},
+            "$setOnInsert": {"created_at": now},
+        },
         upsert=True,
     )
+    return _cart_response(session_id, {"items": items, "subtotal": subtotal, "total_items": total_items})
 
-    response = {
-        "session_id": session_id,
-        "items": [{"product_id": str(it["product_id"]), "quantity": it["quantity"], "price_at_add": it["price_at_add"]} for it in items],
-        "total_items": sum(it["quantity"] for it in items),
-        "subtotal": subtotal,
-    }
-    return response
+
+@router.post("/{session_id}/items", response_model=CartResponse)
+async def add_cart_item(session_id: str, payload: CartItemAdd, db=Depends(get_database)):
+    """
+    Add `quantity` of a product, creating the cart if needed. A product
+    already in the cart keeps its `price_at_add`; only its line and the
+    stored totals change.
+    """
+    [line] = await price_items(db, [payload])
+    doc = await db[CART_COLL].find_one_and_update(
+        {"session_id": session_id},
+        add_item_pipeline(line["product_id"], line["quantity"], line["price"], datetime.datetime.utcnow()),
+        projection=CART_PROJECTION,
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    return _cart_response(session_id, doc)
+
+
+@router.put("/{session_id}/items/{product_id}", response_model=CartResponse)
+async def set_cart_item_quantity(session_id: str, product_id: str, payload: CartItemQuantity, db=Depends(get_database)):
+    """Set the quantity of a product already in the cart; 0 removes it."""
+    oid = _object_id(product_id)
+    doc = await db[CART_COLL].find_one_and_update(
+        {"session_id": session_id, "items.product_id": oid},
+        set_quantity_pipeline(oid, payload.quantity, datetime.datetime.utcnow()),
+        projection=CART_PROJECTION,
+        return_document=ReturnDocument.AFTER,
+    )
+    if not doc:
+        raise HTTPException(status_code=404, detail="Product not in cart")
+    return _cart_response(session_id, doc)
+
+
+@router.delete("/{session_id}/items/{product_id}", response_model=CartResponse)
+async def remove_cart_item(session_id: str, product_id: str, db=Depends(get_database)):
+    """Remove a product's line from the cart; removing one that isn't there is a no-op."""
+    oid = _object_id(product_id)
+    doc = await db[CART_COLL].find_one_and_update(
+        {"session_id": session_id},
+        set_quantity_pipeline(oid, 0, datetime.datetime.utcnow()),
+        projection=CART_PROJECTION,
+        return_document=ReturnDocument.AFTER,
+    )
+    return _cart_response(session_id, doc)
 
 
 @router.get("/{session_id}", response_model=CartResponse)
 async def get_cart(session_id: str, db=Depends(get_database)):
-    doc = await db[CART_COLL].find_one({"session_id": session_id})
-    if not doc:
-        return {"session_id": session_id, "items": [], "total_items": 0, "subtotal": 0.0}
-    items = [{"product_id": str(it["product_id"]), "quantity": it["quantity"], "price_at_add": it["price_at_add"]} for it in doc.get("items", [])]
-    subtotal = sum(it["quantity"] * it["price_at_add"] for it in doc.get("items", []))
-    return {"session_id": session_id, "items": items, "total_items": sum(it["quantity"] for it in doc.get("items", [])), "subtotal": subtotal}
+    doc = await db[CART_COLL].find_one({"session_id": session_id}, CART_PROJECTION)
+    return _cart_response(session_id, doc)
@@ -1,11 +1,15 @@
 # app/routers/checkout.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends
+from bson import ObjectId
+from pymongo import UpdateOne
 from ..deps import get_database, get_optional_customer_token
 from ..schemas.order import CheckoutRequest, OrderResponse
-from ..models.order import COLLECTION as ORDERS_COLL, ensure_order_indexes
+from ..models.order import COLLECTION as ORDERS_COLL
 from ..models.product import COLLECTION as PRODUCT_COLL
+from ..models.sales import COLLECTION as SALES_COLL, rollup_update
 from ..models.customer import COLLECTION as CUSTOMERS_COLL, generate_customer_token
-from bson import ObjectId
+from ..utils.pricing import price_items
+from typing import Dict, List, Set
 import datetime
 import secrets
 
@@ -17,40 +21,109 @@ async def _gen_order_number(db, prefix="ORD"):
     return f"{prefix}-{int(datetime.datetime.utcnow().timestamp())}-{secrets.token_hex(3)}"
 
 
+# Each guarded decrement also stamps the product with the line's reservation
+# id, so when a reservation comes up short (or fails part-way) one read says
+# which lines took stock. Only the most recent ids are kept; they are read
+# right after the write, long before this many checkouts touch one product.
+RESERVATION_LOG = 100
+
+
+def _reservation_ids(token: str, lines: List[Dict]) -> List[str]:
+    return [f"{token}:{i}" for i in range(len(lines))]
+
+
+async def _reserve_stock(db, lines: List[Dict], token: str) -> Set[int]:
+    """
+    Decrement stock for every line, guarded by `stock >= qty`, in one ordered
+    `bulk_write` (never an upsert, so a product deleted after pricing simply
+    doesn't match). When every line matched that is all; otherwise the lines
+    that didn't are found through their reservation ids.
+
+    Returns the indexes (into `lines`) that could not be reserved.
+    """
+    if not lines:
+        return set()
+    ops = [
+        UpdateOne(
+            {"_id": ln["product_id"], "stock": {"$gte": ln["quantity"]}},
+            {"$inc": {"stock": -ln["quantity"]}, "$push": {"reservations": {"$each": [rid], "$slice": -RESERVATION_LOG}}},
+        )
+        for ln, rid in zip(lines, _reservation_ids(token, lines))
+    ]
+    res = await db[PRODUCT_COLL].bulk_write(ops, ordered=True)
+    if res.matched_count == len(lines):
+        return set()
+    return set(range(len(lines))) - await _reserved_lines(db, lines, token)
+
+
+async def _reserved_lines(db, lines: List[Dict], token: str) -> Set[int]:
+    """Indexes of the lines whose reservation under `token` took stock."""
+    rids = _reservation_ids(token, lines)
+    cursor = db[PRODUCT_COLL].find(
+        {"_id": {"$in": list({ln["product_id"] for ln in lines})}, "reservations": {"$in": rids}},
+        {"reservations": 1},
+    )
+    stamped = {r for d in await cursor.to_list(length=None) for r in d["reservations"]}
+    return {i for i, rid in enumerate(rids) if rid in stamped}
+
+
+async def _release_stock(db, lines: List[Dict]):
+    ops = [UpdateOne({"_id": ln["product_id"]}, {"$inc": {"stock": ln["quantity"]}}) for ln in lines]
+    if ops:
+        await db[PRODUCT_COLL].bulk_write(ops, ordered=False)
+
+
 @router.post("/", response_model=OrderResponse)
 async def checkout(payload: CheckoutRequest, db=Depends(get_database), customer_token=Depends(get_optional_customer_token)):
-    # Validate items and compute totals
-    subtotal = 0.0
-    items_out = []
-    for it in payload.items:
-        pid = it.get("product_id")
-        qty = int(it.get("quantity", 1))
-        if not ObjectId.is_valid(pid):
-            raise HTTPException(status_code=400, detail=f"Invalid product id: {pid}")
-        prod = await db[PRODUCT_COLL].find_one({"_id": ObjectId(pid)})
-        if not prod:
-            raise HTTPException(status_code=404, detail=f"Product {pid} not found")
-        price = prod.get("sale_price") if prod.get("on_sale") and prod.get("sale_price") else prod.get("price")
-        items_out.append({"product_id": ObjectId(pid), "title": prod.get("title"), "qty": qty, "price": float(price)})
-        subtotal += float(price) * qty
+    # Validate and price all items with one batched product lookup
+    lines = await price_items(db, payload.items)
+    subtotal = sum(ln["price"] * ln["quantity"] for ln in lines)
 
     # Simple totals (no taxes/shipping calculation here — extend as needed)
     total = subtotal
 
-    order_number = await _gen_order_number(db)
-    now = datetime.datetime.utcnow()
+    # Reserve stock before the order exists so it records what was actually
+    # available; if anything fails before the order is stored, give it back
+    reservation = str(ObjectId())
+    short = None
+    try:
+        short = await _reserve_stock(db, lines, reservation)
+        backordered = [str(lines[i]["product_id"]) for i in sorted(short)]
 
-    order_doc = {
-        "order_number": order_number,
-        "items": items_out,
-        "subtotal": subtotal,
-        "total": total,
-        "customer": payload.customer.dict(),
-        "status": "pending",
-        "created_at": now,
-    }
+        items_out = [
+            {
+                "product_id": ln["product_id"],
+                "title": ln["product"].get("name") or ln["product"].get("title"),
+                "qty": ln["quantity"],
+                "price": ln["price"],
+                "backordered": i in short,
+            }
+            for i, ln in enumerate(lines)
+        ]
 
-    await db[ORDERS_COLL].insert_one(order_doc)
+        order_number = await _gen_order_number(db)
+        now = datetime.datetime.utcnow()
+
+        order_doc = {
+            "order_number": order_number,
+            "items": items_out,
+            "subtotal": subtotal,
+            "total": total,
+            "customer": payload.customer.dict(),
+            "status": "pending",
+            "backordered": backordered,
+            "created_at": now,
+        }
+
+        res = await db[ORDERS_COLL].insert_one(order_doc)
+    except Exception:
+        # A reservation that failed part-way may still have taken some lines
+        taken = await _reserved_lines(db, lines, reservation) if short is None else set(range(len(lines))) - short
+        await _release_stock(db, [lines[i] for i in sorted(taken)])
+        raise
+
+    # Count the order in today's sales rollup
+    await db[SALES_COLL].update_one(*rollup_update(now, total), upsert=True)
 
     # optional save profile
     saved_token = None
@@ -67,15 +140,13 @@ async def checkout(payload: CheckoutRequest, db=Depends(get_database), customer_
         await db[CUSTOMERS_COLL].update_one({"email": cust["email"]}, {"$set": cust}, upsert=True)
         saved_token = token
 
-    # Decrement product stock (best-effort, not transactional)
-    for it in items_out:
-        await db[PRODUCT_COLL].update_one({"_id": it["product_id"], "stock": {"$gte": it["qty"]}}, {"$inc": {"stock": -it["qty"]}})
-
     # return
     response = {
+        "id": str(res.inserted_id),
         "order_number": order_number,
         "status": "pending",
         "total": total,
+        "backordered": backordered,
         "created_at": now.isoformat(),
     }
     if saved_token:
@@ -1,14 +1,20 @@
 # backend/app/routers/orders.py
 
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import List, Optional, Union
 from bson import ObjectId
 from pydantic import BaseModel, Field, validator
-from ..deps import get_database
-from ..models.order import COLLECTION as ORDER_COLL, doc_to_out
-from ..schemas.order import OrderOut
+from pymongo import ReturnDocument, UpdateOne
+from ..deps import get_admin_user, get_database
+from ..models.order import (
+    COLLECTION as ORDER_COLL, ORDER_STATUSES, ORDER_TRANSITIONS, SUMMARY_PROJECTION, doc_to_out, doc_to_summary,
+)
+from ..schemas.order import OrderOut, OrderSummary, OrderPage
+from ..utils import fast_json
+from ..utils.pagination import encode_cursor, keyset_filter
+import datetime
 
-router = APIRouter(tags=["orders"])
+router = APIRouter(prefix="/orders", tags=["orders"])
 
 # A new Pydantic model to validate the incoming status update
 class OrderUpdate(BaseModel):
@@ -16,18 +22,68 @@ class OrderUpdate(BaseModel):
 
     @validator('status')
     def validate_status(cls, v):
-        valid_statuses = ["pending", "processing", "ready-to-ship", "shipped", "delivered", "cancelled"]
-        if v not in valid_statuses:
-            raise ValueError(f"Status must be one of: {', '.join(valid_statuses)}")
+        if v not in ORDER_STATUSES:
+            raise ValueError(f"Status must be one of: {', '.join(ORDER_STATUSES)}")
         return v
 
-@router.get("/", response_model=List[OrderOut])
-async def list_orders(db=Depends(get_database)):
-    cursor = db[ORDER_COLL].find().sort("created_at", -1).limit(50)
-    orders = []
-    async for d in cursor:
-        orders.append(doc_to_out(d))
-    return orders
+class OrderBulkStatusUpdate(OrderUpdate):
+    ids: List[str] = Field(..., min_length=1, max_length=500)
+
+def _naive_utc(dt: datetime.datetime) -> datetime.datetime:
+    # created_at is stored as naive UTC
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return dt
+
+# Lists and searches across customers (names, emails), so admin only
+@router.get("/", response_model=Union[List[OrderSummary], OrderPage], dependencies=[Depends(get_admin_user)])
+async def list_orders(
+    response: Response,
+    status: Optional[str] = Query(None, description=f"One of: {', '.join(ORDER_STATUSES)}"),
+    from_: Optional[datetime.datetime] = Query(None, alias="from", description="created_at >= (UTC)"),
+    to: Optional[datetime.datetime] = Query(None, description="created_at < (UTC)"),
+    email: Optional[str] = Query(None, description="Customer email"),
+    limit: int = Query(50, ge=1, le=200),
+    after: Optional[str] = Query(None, description="Cursor from a previous page's X-Next-Cursor"),
+    envelope: bool = Query(False, description="Return {items, pagination} instead of a bare list"),
+    db=Depends(get_database),
+):
+    """
+    Newest orders first, filtered and keyset-paginated. Rows are summaries
+    (no item array); fetch /orders/{id} for the full order.
+    """
+    query = {}
+    if status:
+        if status not in ORDER_STATUSES:
+            raise HTTPException(status_code=400, detail=f"Status must be one of: {', '.join(ORDER_STATUSES)}")
+        query["status"] = status
+    if email:
+        query["customer.email"] = email
+    if from_ or to:
+        query["created_at"] = {}
+        if from_:
+            query["created_at"]["$gte"] = _naive_utc(from_)
+        if to:
+            query["created_at"]["$lt"] = _naive_utc(to)
+    if after:
+        try:
+            query = {"$and": [query, keyset_filter(after)]}
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    cursor = db[ORDER_COLL].find(query, SUMMARY_PROJECTION, limit=limit).sort([("created_at", -1), ("_id", -1)])
+    docs = await cursor.to_list(length=limit)
+
+    next_cursor = None
+    if len(docs) == limit and docs[-1].get("created_at"):
+        next_cursor = encode_cursor(docs[-1]["created_at"], docs[-1]["_id"])
+        response.headers["X-Next-Cursor"] = next_cursor
+
+    items = [doc_to_summary(d) for d in docs]
+    if envelope:
+        page = {"items": items, "pagination": {"limit": limit, "next_cursor": next_cursor}}
+        return fast_json.respond(OrderPage, page, response)
+    return fast_json.respond(List[OrderSummary], items, response)
 
 @router.get("/{order_id}", response_model=OrderOut)
 async def get_order(order_id: str, db=Depends(get_database)):
@@ -36,29 +92,109 @@ async def get_order(order_id: str, db=Depends(get_database)):
     doc = await db[ORDER_COLL].find_one({"_id": ObjectId(order_id)})
     if not doc:
         raise HTTPException(status_code=404, detail="Order not found")
-    return doc_to_out(doc)
+    return fast_json.respond(OrderOut, doc_to_out(doc))
+
+def _allowed_from(target: str) -> List[str]:
+    return [s for s, nexts in ORDER_TRANSITIONS.items() if target in nexts]
+
+@router.post("/status/bulk", dependencies=[Depends(get_admin_user)])
+async def bulk_update_order_status(update: OrderBulkStatusUpdate, db=Depends(get_database)):
+    """
+    Move many orders to one status. Each id gets an outcome:
+    updated, unchanged (already there), not_found, invalid_id,
+    invalid_transition (see ORDER_TRANSITIONS), or conflict (changed by
+    someone else meanwhile; `from` is its status now). Reads current statuses with
+    one $in query and applies every allowed change with one unordered
+    bulk_write, each update guarded on the status that order was read with,
+    so a concurrent change is never overwritten and `from` is what was replaced.
+    """
+    target = update.status
+    allowed_from = _allowed_from(target)
+
+    ids = list(dict.fromkeys(update.ids))
+    results = {}
+    oids = {}
+    for order_id in ids:
+        if ObjectId.is_valid(order_id):
+            oids[order_id] = ObjectId(order_id)
+        else:
+            results[order_id] = {"id": order_id, "outcome": "invalid_id"}
+
+    current = {}
+    if oids:
+        cursor = db[ORDER_COLL].find({"_id": {"$in": list(oids.values())}}, {"status": 1})
+        async for d in cursor:
+            current[d["_id"]] = d.get("status")
+
+    candidates = []
+    for order_id, oid in oids.items():
+        if oid not in current:
+            results[order_id] = {"id": order_id, "outcome": "not_found"}
+        elif current[oid] == target:
+            results[order_id] = {"id": order_id, "outcome": "unchanged", "from": target}
+        elif current[oid] not in allowed_from:
+            results[order_id] = {"id": order_id, "outcome": "invalid_transition", "from": current[oid]}
+        else:
+            candidates.append((order_id, oid))
+
+    if candidates:
+        res = await db[ORDER_COLL].bulk_write(
+            [UpdateOne({"_id": oid, "status": current[oid]}, {"$set": {"status": target}}) for _, oid in candidates],
+            ordered=False,
+        )
+        raced = {}
+        if res.modified_count < len(candidates):
+            # Some orders changed status between the read and the write, so their
+            # guard didn't match; re-read just those to report what they are now.
+            cursor = db[ORDER_COLL].find(
+                {"_id": {"$in": [oid for _, oid in candidates]}, "status": {"$ne": target}}, {"status": 1}
+            )
+            async for d in cursor:
+                raced[d["_id"]] = d.get("status")
+        for order_id, oid in candidates:
+            if oid in raced:
+                results[order_id] = {"id": order_id, "outcome": "conflict", "from": raced[oid]}
+            else:
+                results[order_id] = {"id": order_id, "outcome": "updated", "from": current[oid]}
+
+    ordered = [results[i] for i in ids]
+    return {
+        "status": target,
+        "updated": sum(1 for r in ordered if r["outcome"] == "updated"),
+        "results": ordered,
+    }
 
 # New route to update an order's status
-@router.put("/{order_id}/status", response_model=OrderOut)
+@router.put("/{order_id}/status", response_model=OrderOut, dependencies=[Depends(get_admin_user)])
 async def update_order_status(order_id: str, update: OrderUpdate, db=Depends(get_database)):
     if not ObjectId.is_valid(order_id):
         raise HTTPException(status_code=400, detail="Invalid order id")
+    oid = ObjectId(order_id)
 
-    # Use MongoDB's update_one with the $set operator to update only the status field
-    result = await db[ORDER_COLL].update_one(
-        {"_id": ObjectId(order_id)},
-        {"$set": {"status": update.status}}
+    # One round trip in the common case: set the status only if ORDER_TRANSITIONS
+    # allows it from the current one (re-setting the same status is a no-op)
+    doc = await db[ORDER_COLL].find_one_and_update(
+        {"_id": oid, "status": {"$in": _allowed_from(update.status) + [update.status]}},
+        {"$set": {"status": update.status}},
+        return_document=ReturnDocument.AFTER,
     )
-
-    if result.modified_count == 0:
-        # If the order wasn't found or the status was already the same
-        doc = await db[ORDER_COLL].find_one({"_id": ObjectId(order_id)})
-        if not doc:
+    if not doc:
+        existing = await db[ORDER_COLL].find_one({"_id": oid}, {"status": 1})
+        if not existing:
             raise HTTPException(status_code=404, detail="Order not found")
-        # If the document was found but not modified, it's not an error.
-        # We can just return the existing document.
-        return doc_to_out(doc)
-    
-    # Fetch the updated document to return it in the response
-    updated_doc = await db[ORDER_COLL].find_one({"_id": ObjectId(order_id)})
-    return doc_to_out(updated_doc)
\ No newline at end of file
+        raise HTTPException(status_code=409, detail=f"Cannot change status from {existing.get('status')} to {update.status}")
+    return doc_to_out(doc)
+
+
+# Deprecated aliases: these routes used to be mounted at the application root.
+# Kept so existing clients don't break; new code should use the /orders paths.
+legacy_router = APIRouter(tags=["orders"], deprecated=True)
+legacy_router.add_api_route(
+    "/", list_orders, methods=["GET"], response_model=Union[List[OrderSummary], OrderPage],
+    dependencies=[Depends(get_admin_user)],
+)
+legacy_router.add_api_route("/{order_id}", get_order, methods=["GET"], response_model=OrderOut)
+legacy_router.add_api_route(
+    "/{order_id}/status", update_order_status, methods=["PUT"], response_model=OrderOut,
+    dependencies=[Depends(get_admin_user)],
+)
@@ -1,52 +1,118 @@
 # backend/app/routers/products.py
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, Response
+from typing import List, Literal, Optional, Union
 from ..deps import get_database
-from ..utils.pagination import parse_limit_offset
-from ..models.product import COLLECTION as PRODUCT_COLL, doc_to_out
-from ..schemas.product import ProductOut
+from ..utils.pagination import parse_limit_offset, encode_cursor, keyset_filter
+from ..models.product import COLLECTION as PRODUCT_COLL, doc_to_out, category_key
+from ..schemas.product import ProductOut, ProductPage
+from ..utils import catalog_cache, fast_json, search
+from ..config import settings
 from bson import ObjectId
+import asyncio
 import json
 import datetime
-from cloudinary import uploader
+from ..utils.cloudinary import UploadError, delete_uploads, upload_images
 
 router = APIRouter(prefix="/products", tags=["products"])
 
 # --------------------------------------
 # GET /products/ (list with filters)
 # --------------------------------------
-@router.get("/", response_model=List[ProductOut])
+@router.get("/", response_model=Union[List[ProductOut], ProductPage])
 async def list_products(
+    response: Response,
     limit: int = Query(24, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    after: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor; replaces offset"),
+    envelope: bool = Query(False, description="Return {items, pagination} instead of a bare list"),
     category: Optional[str] = Query(None),
     subcategories: Optional[List[str]] = Query(None),
     db=Depends(get_database),
 ):
     """
     Lists products with optional filtering by category and subcategories.
+
+    Pages with `offset` (kept for compatibility) or, preferably, with the
+    `after` cursor returned as `X-Next-Cursor` / `pagination.next_cursor`,
+    which stays fast and stable however deep the client pages.
     """
     limit, offset = parse_limit_offset(limit, offset)
-    query = {}
-    
-    if category:
-        query["metadata.category"] = {"$regex": f"^{category}$", "$options": "i"}
+    if after:
+        offset = 0
+    key = catalog_cache.listing_key(limit, offset, category, subcategories, after)
+    items = catalog_cache.get_listing(key)
+    if items is catalog_cache.MISSING:
+        gen = catalog_cache.generation()
+        query = {}
+
+        if category:
+            query["category_key"] = category_key(category)
+
+        if subcategories:
+            # Use $in operator to match any of the provided subcategories
+            query["metadata.subcategories"] = {"$in": subcategories}
+
+        if after:
+            try:
+                query.update(keyset_filter(after))
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
 
+        cursor = (
+            db[PRODUCT_COLL]
+            .find(query, skip=offset, limit=limit)
+            .sort([("created_at", -1), ("_id", -1)])
+        )
+        items = []
+        async for d in cursor:
+            items.append(doc_to_out(d))
+        catalog_cache.store_listing(key, items, gen)
 
-    if subcategories:
-        # Use $in operator to match any of the provided subcategories
-        query["metadata.subcategories"] = {"$in": subcategories}
+    next_cursor = None
+    if len(items) == limit and items[-1]["created_at"]:
+        last = items[-1]
+        next_cursor = encode_cursor(datetime.datetime.fromisoformat(last["created_at"]), ObjectId(last["id"]))
+        response.headers["X-Next-Cursor"] = next_cursor
 
-    cursor = (
-        db[PRODUCT_COLL]
-        .find(query, skip=offset, limit=limit)
-        .sort("created_at", -1)
-    )
-    items = []
-    async for d in cursor:
-        items.append(doc_to_out(d))
-    return items
+    if envelope:
+        page = {"items": items, "pagination": {"limit": limit, "offset": offset, "next_cursor": next_cursor}}
+        return fast_json.respond(ProductPage, page, response)
+    return fast_json.respond(List[ProductOut], items, response)
+
+# --------------------------------------
+# GET /products/search
+# --------------------------------------
+@router.get("/search", response_model=ProductPage)
+async def search_products(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(24, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    engine: Optional[Literal["memory", "mongo"]] = Query(None, description="Defaults to the SEARCH_ENGINE setting"),
+    db=Depends(get_database),
+):
+    """
+    Ranked search over name, description, category and subcategories.
+    """
+    limit, offset = parse_limit_offset(limit, offset)
+    engine = engine or settings.SEARCH_ENGINE
+    if engine == "mongo":
+        query = {"$text": {"$search": q}}
+        score = {"score": {"$meta": "textScore"}}
+        cursor = (
+            db[PRODUCT_COLL]
+            .find(query, score, skip=offset, limit=limit)
+            .sort([("score", {"$meta": "textScore"}), ("created_at", -1)])
+        )
+        # Same pagination contract as the in-memory engine: the page plus the total match count
+        docs, total = await asyncio.gather(cursor.to_list(length=limit), db[PRODUCT_COLL].count_documents(query))
+        items = [doc_to_out(d) for d in docs]
+    else:
+        index = await search.product_index.get(db)
+        ids, total = index.search(q, limit, offset)
+        items = await catalog_cache.load_products(db, ids)
+    page = {"items": items, "pagination": {"limit": limit, "offset": offset, "total": total}}
+    return fast_json.respond(ProductPage, page)
 
 # --------------------------------------
 # GET /products/{id}
@@ -55,10 +121,16 @@ async def list_products(
 async def get_product(product_id: str, db=Depends(get_database)):
     if not ObjectId.is_valid(product_id):
         raise HTTPException(status_code=400, detail="Invalid product id")
+    cached = catalog_cache.get_product(product_id)
+    if cached is not catalog_cache.MISSING:
+        return fast_json.respond(ProductOut, cached)
+    gen = catalog_cache.generation()
     d = await db[PRODUCT_COLL].find_one({"_id": ObjectId(product_id)})
     if not d:
         raise HTTPException(status_code=404, detail="Product not found")
-    return doc_to_out(d)
+    out = doc_to_out(d)
+    catalog_cache.store_product(out, gen)
+    return fast_json.respond(ProductOut, out)
 
 
 # --------------------------------------
@@ -140,14 +212,13 @@ async def create_product(
     stock_value = 100 if inStock else 0
     created_at_date = datetime.datetime.utcnow()
 
-    image_urls = []
-    for image in images:
-        try:
-            upload_result = uploader.upload(image.file, folder="ecommerce-products")
-            image_urls.append(upload_result.get("secure_url"))
-        except Exception as e:
-            print(f"Cloudinary upload failed: {e}")
-            raise HTTPException(status_code=500, detail="Image upload failed.")
+    # Upload all images concurrently, off the event loop
+    try:
+        uploaded = await upload_images([image.file for image in images], folder="ecommerce-products")
+    except UploadError as e:
+        print(f"Cloudinary upload failed: {e.__cause__ or e}")
+        raise HTTPException(status_code=500, detail="Image upload failed.")
+    image_urls = [u["secure_url"] for u in uploaded]
     
     # Combine all subcategory lists into a single list for the database
     all_subcategories = subcats + collections_list + materials_list + groups_list + age_groups_list
@@ -162,6 +233,7 @@ async def create_product(
         "created_at": created_at_date,
         "updated_at": datetime.datetime.utcnow(),
         "images": image_urls,
+        "category_key": category_key(category),
         "metadata": {
             "category": category,
             "subcategories": all_subcategories,
@@ -173,7 +245,13 @@ async def create_product(
         },
     }
 
-    result = await db[PRODUCT_COLL].insert_one(doc)
+    try:
+        result = await db[PRODUCT_COLL].insert_one(doc)
+    except Exception:
+        await delete_uploads([u["public_id"] for u in uploaded])
+        raise
+    catalog_cache.invalidate_product(result.inserted_id)
+    search.index_product(doc)
     return {"ok": True, "product_id": str(result.inserted_id)}
 
 # --------------------------------------
@@ -188,6 +266,8 @@ async def delete_product(product_id: str, db=Depends(get_database)):
         raise HTTPException(status_code=400, detail="Invalid product ID")
 
     result = await db[PRODUCT_COLL].delete_one({"_id": ObjectId(product_id)})
+    catalog_cache.invalidate_product(product_id)
+    search.unindex_product(product_id)
 
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Product not found")
@@ -1,12 +1,16 @@
 # app/routers/reviews.py
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
-from ..deps import get_database
-from ..schemas.review import ReviewCreate, ReviewOut
-from ..models.review import COLLECTION as REVIEWS_COLL
-from ..models.product import COLLECTION as PRODUCT_COLL
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from typing import List, Optional, Union
+from ..deps import get_database, get_admin_user
+from ..schemas.review import ReviewCreate, ReviewOut, ReviewPage
+from ..models.review import COLLECTION as REVIEWS_COLL, rating_stats_pipeline
+from ..models.product import COLLECTION as PRODUCT_COLL, EMPTY_RATING_STATS, rating_summary, rating_update
+from ..utils import catalog_cache
+from ..utils.pagination import encode_cursor, keyset_filter
 from bson import ObjectId
 import datetime
+import json
 
 router = APIRouter(prefix="/reviews", tags=["reviews"])
 
@@ -21,16 +25,94 @@ def review_doc_to_out(doc) -> dict:
         "created_at": doc.get("created_at").isoformat() if doc.get("created_at") else None,
     }
 
-@router.get("/", response_model=List[dict])
-async def list_all_reviews(db=Depends(get_database)):
+async def _apply_rating(db, product_oid: ObjectId, rating: int, delta: int) -> bool:
     """
-    Return all reviews (best limited on frontend for dashboard use).
+    Apply one review (delta=1, before it is inserted) or its removal
+    (delta=-1, after it is deleted) to the product's `rating_stats`.
+    Returns False when the product doesn't exist.
     """
-    cursor = db[REVIEWS_COLL].find().sort("created_at", -1)
-    out = []
-    async for d in cursor:
-        out.append(review_doc_to_out(d))
-    return out
+    res = await db[PRODUCT_COLL].update_one({"_id": product_oid, "rating_stats": {"$exists": True}}, rating_update(rating, delta))
+    if res.matched_count:
+        return True
+
+    # No aggregate yet: seed it from the reviews as they stood before this change.
+    # A concurrent request that seeded first wins ($ifNull), and this delta applies on top.
+    rows = await db[REVIEWS_COLL].aggregate(rating_stats_pipeline({"product_id": product_oid})).to_list(length=1)
+    seed = rows[0]["rating_stats"] if rows else {**EMPTY_RATING_STATS, "hist": {}}
+    if delta < 0:
+        # the removed review is already gone from the collection; count it back in
+        seed["sum"] += rating
+        seed["count"] += 1
+        seed["hist"][str(rating)] = seed["hist"].get(str(rating), 0) + 1
+    res = await db[PRODUCT_COLL].update_one({"_id": product_oid}, rating_update(rating, delta, seed))
+    return res.matched_count > 0
+
+
+async def _page_reviews(db, query: dict, response: Response, limit: int, after: Optional[str], envelope: bool):
+    """
+    One page of reviews, newest first, continuing from the `after` cursor.
+    The next cursor is returned as `X-Next-Cursor` (and in the envelope).
+    """
+    if after:
+        try:
+            query = {**query, **keyset_filter(after)}
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    cursor = db[REVIEWS_COLL].find(query, limit=limit).sort([("created_at", -1), ("_id", -1)])
+    docs = await cursor.to_list(length=limit)
+
+    next_cursor = None
+    if len(docs) == limit and docs[-1].get("created_at"):
+        next_cursor = encode_cursor(docs[-1]["created_at"], docs[-1]["_id"])
+        response.headers["X-Next-Cursor"] = next_cursor
+
+    items = [review_doc_to_out(d) for d in docs]
+    if envelope:
+        return {"items": items, "pagination": {"limit": limit, "next_cursor": next_cursor}}
+    return items
+
+
+@router.get("/", response_model=Union[List[dict], ReviewPage])
+async def list_all_reviews(
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    after: Optional[str] = Query(None, description="Cursor from a previous page's X-Next-Cursor"),
+    envelope: bool = Query(False, description="Return {items, pagination} instead of a bare list"),
+    db=Depends(get_database),
+):
+    """
+    Return reviews newest first, one page at a time.
+    Use /reviews/export to pull the whole collection.
+    """
+    return await _page_reviews(db, {}, response, limit, after, envelope)
+
+
+@router.get("/export", dependencies=[Depends(get_admin_user)])
+async def export_reviews(
+    product_id: Optional[str] = Query(None),
+    batch_size: int = Query(500, ge=1, le=5000),
+    db=Depends(get_database),
+):
+    """
+    Stream reviews as NDJSON (one JSON object per line), newest first.
+    Written batch by batch as the cursor yields them, so memory stays flat
+    regardless of collection size.
+    """
+    query = {}
+    if product_id:
+        if not ObjectId.is_valid(product_id):
+            raise HTTPException(status_code=400, detail="Invalid product id format")
+        query["product_id"] = ObjectId(product_id)
+    cursor = db[REVIEWS_COLL].find(query).sort([("created_at", -1), ("_id", -1)]).batch_size(batch_size)
+
+    async def lines():
+        while True:
+            docs = await cursor.to_list(length=batch_size)
+            if not docs:
+                break
+            yield "".join(json.dumps(review_doc_to_out(d)) + "\n" for d in docs)
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
 
 @router.post("/", status_code=201)
 async def create_review(payload: ReviewCreate, db=Depends(get_database)):
@@ -41,85 +123,57 @@ async def create_review(payload: ReviewCreate, db=Depends(get_database)):
     if not ObjectId.is_valid(payload.product_id):
         raise HTTPException(status_code=400, detail="Invalid product id format")
     
-    # Check if product exists
-    prod = await db[PRODUCT_COLL].find_one({"_id": ObjectId(payload.product_id)})
-    if not prod:
-        raise HTTPException(status_code=404, detail="Product not found")
-    
     # Validate rating range
     if payload.rating < 1 or payload.rating > 5:
         raise HTTPException(status_code=400, detail="Rating must be between 1 and 5")
-    
+
+    # Count the review on the product first; this doubles as the existence check
+    product_oid = ObjectId(payload.product_id)
+    if not await _apply_rating(db, product_oid, payload.rating, 1):
+        raise HTTPException(status_code=404, detail="Product not found")
+
     # Create review document
     now = datetime.datetime.utcnow()
     review_doc = {
-        "product_id": ObjectId(payload.product_id),
+        "product_id": product_oid,
         "author": payload.author or "Anonymous",
         "rating": payload.rating,
         "comment": payload.comment or "",
         "created_at": now,
     }
-    
+
     # Insert review
-    result = await db[REVIEWS_COLL].insert_one(review_doc)
-    
-    # Update product rating and review count
-    await update_product_rating(db, payload.product_id)
-    
+    try:
+        result = await db[REVIEWS_COLL].insert_one(review_doc)
+    except Exception:
+        await _apply_rating(db, product_oid, payload.rating, -1)
+        raise
+    catalog_cache.invalidate_product(payload.product_id)
+
     return {
         "ok": True, 
         "review_id": str(result.inserted_id),
         "message": "Review created successfully"
     }
 
-async def update_product_rating(db, product_id: str):
-    """
-    Update product's average rating and review count based on all reviews.
-    """
-    try:
-        # Get all reviews for this product
-        reviews_cursor = db[REVIEWS_COLL].find({"product_id": ObjectId(product_id)})
-        reviews = await reviews_cursor.to_list(length=None)
-        
-        if reviews:
-            # Calculate average rating
-            total_rating = sum(review["rating"] for review in reviews)
-            avg_rating = total_rating / len(reviews)
-            review_count = len(reviews)
-        else:
-            avg_rating = 0
-            review_count = 0
-        
-        # Update product metadata
-        await db[PRODUCT_COLL].update_one(
-            {"_id": ObjectId(product_id)},
-            {
-                "$set": {
-                    "metadata.rating": round(avg_rating, 1),
-                    "metadata.reviews": review_count,
-                    "updated_at": datetime.datetime.utcnow()
-                }
-            }
-        )
-    except Exception as e:
-        print(f"Error updating product rating: {e}")
-
-@router.get("/product/{product_id}", response_model=List[dict])
-async def list_reviews_for_product(product_id: str, db=Depends(get_database)):
+@router.get("/product/{product_id}", response_model=Union[List[dict], ReviewPage])
+async def list_reviews_for_product(
+    product_id: str,
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    after: Optional[str] = Query(None, description="Cursor from a previous page's X-Next-Cursor"),
+    envelope: bool = Query(False, description="Return {items, pagination} instead of a bare list"),
+    db=Depends(get_database),
+):
     """
-    Get all reviews for a specific product.
+    Get reviews for a specific product, newest first, one page at a time.
     """
     # Validate product ID format
     if not ObjectId.is_valid(product_id):
         raise HTTPException(status_code=400, detail="Invalid product id format")
-    
-    # Get reviews for the product
-    cursor = db[REVIEWS_COLL].find({"product_id": ObjectId(product_id)}).sort("created_at", -1)
-    reviews = []
-    async for doc in cursor:
-        reviews.append(review_doc_to_out(doc))
-    
-    return reviews
+
+    # Served by the (product_id, created_at, _id) index
+    return await _page_reviews(db, {"product_id": ObjectId(product_id)}, response, limit, after, envelope)
 
 @router.delete("/{review_id}")
 async def delete_review(review_id: str, db=Depends(get_database)):
@@ -130,22 +184,15 @@ async def delete_review(review_id: str, db=Depends(get_database)):
     if not ObjectId.is_valid(review_id):
         raise HTTPException(status_code=400, detail="Invalid review id format")
     
-    # Find the review to get product_id before deletion
-    review = await db[REVIEWS_COLL].find_one({"_id": ObjectId(review_id)})
+    # Delete the review, getting back its product and rating
+    review = await db[REVIEWS_COLL].find_one_and_delete({"_id": ObjectId(review_id)}, projection={"product_id": 1, "rating": 1})
     if not review:
         raise HTTPException(status_code=404, detail="Review not found")
-    
-    product_id = str(review["product_id"])
-    
-    # Delete the review
-    result = await db[REVIEWS_COLL].delete_one({"_id": ObjectId(review_id)})
-    
-    if result.deleted_count == 0:
-        raise HTTPException(status_code=404, detail="Review not found")
-    
-    # Update product rating after deletion
-    await update_product_rating(db, product_id)
-    
+
+    # Take it back out of the product's rating aggregate
+    await _apply_rating(db, review["product_id"], review["rating"], -1)
+    catalog_cache.invalidate_product(review["product_id"])
+
     return {"message": f"Review with ID {review_id} deleted successfully"}
 
 @router.get("/stats/{product_id}")
@@ -155,8 +202,13 @@ async def get_review_stats(product_id: str, db=Depends(get_database)):
     """
     if not ObjectId.is_valid(product_id):
         raise HTTPException(status_code=400, detail="Invalid product id format")
-    
-    # Aggregate review statistics
+
+    # Served from the product's incremental aggregate when it has one
+    prod = await db[PRODUCT_COLL].find_one({"_id": ObjectId(product_id)}, {"rating_stats": 1})
+    if prod and prod.get("rating_stats"):
+        return rating_summary(prod["rating_stats"])
+
+    # Otherwise (not reconciled yet) aggregate review statistics
     pipeline = [
         {"$match": {"product_id": ObjectId(product_id)}},
         {
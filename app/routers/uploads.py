@@ -1,7 +1,14 @@
 # app/routers/uploads.py
-from fastapi import APIRouter, Depends
-from ..utils.cloudinary import cloudinary_signature
-from ..deps import get_database
+from fastapi import APIRouter, Depends, HTTPException
+from pymongo import ReturnDocument
+from bson import ObjectId
+from ..utils.cloudinary import cloudinary_signature, scoped_upload_params, verify_upload_signature, delivery_url
+from ..utils import catalog_cache, search
+from ..deps import get_database, get_admin_user
+from ..config import settings
+from ..models.product import COLLECTION as PRODUCT_COLL, doc_to_out
+from ..schemas.upload import UploadSignRequest, UploadFinalize
+import datetime
 
 router = APIRouter(prefix="/uploads", tags=["uploads"])
 
@@ -15,3 +22,56 @@ async def get_cloudinary_sign():
     """
     sig = cloudinary_signature({})
     return sig
+
+
+@router.post("/cloudinary-sign/batch", dependencies=[Depends(get_admin_user)])
+async def sign_upload_batch(payload: UploadSignRequest):
+    """
+    Returns `count` signatures for direct browser-to-Cloudinary uploads, so
+    image bytes never pass through our workers. Each one is scoped to its own
+    server-chosen public_id in the product folder, with the eager
+    transformations signed too. POST each entry's fields (plus `file` and
+    `api_key`) to `upload_url`, then hand the results to /uploads/finalize.
+    """
+    eager = settings.CLOUDINARY_EAGER if payload.eager is None else payload.eager
+    return {
+        "cloud_name": settings.CLOUDINARY_CLOUD_NAME,
+        "api_key": settings.CLOUDINARY_API_KEY,
+        "upload_url": f"https://api.cloudinary.com/v1_1/{settings.CLOUDINARY_CLOUD_NAME}/image/upload",
+        "uploads": [scoped_upload_params(settings.CLOUDINARY_UPLOAD_FOLDER, eager) for _ in range(payload.count)],
+    }
+
+
+@router.post("/finalize", dependencies=[Depends(get_admin_user)])
+async def finalize_uploads(payload: UploadFinalize, db=Depends(get_database)):
+    """
+    Attach directly-uploaded Cloudinary assets to a product. Each asset's
+    response signature is verified, so only genuine uploads into our folder
+    are accepted; delivery URLs are built server-side.
+    """
+    if not ObjectId.is_valid(payload.product_id):
+        raise HTTPException(status_code=400, detail="Invalid product id")
+
+    prefix = f"{settings.CLOUDINARY_UPLOAD_FOLDER}/"
+    rejected = [
+        a.public_id for a in payload.assets
+        if not a.public_id.startswith(prefix) or not verify_upload_signature(a.public_id, str(a.version), a.signature)
+    ]
+    if rejected:
+        raise HTTPException(status_code=400, detail={"message": "Invalid upload signature", "public_ids": rejected})
+
+    urls = [delivery_url(a.public_id, str(a.version), a.format) for a in payload.assets]
+    assets = [{"public_id": a.public_id, "version": str(a.version)} for a in payload.assets]
+    doc = await db[PRODUCT_COLL].find_one_and_update(
+        {"_id": ObjectId(payload.product_id)},
+        {
+            "$push": {"images": {"$each": urls}, "image_assets": {"$each": assets}},
+            "$set": {"updated_at": datetime.datetime.utcnow()},
+        },
+        return_document=ReturnDocument.AFTER,
+    )
+    if not doc:
+        raise HTTPException(status_code=404, detail="Product not found")
+    catalog_cache.invalidate_product(payload.product_id)
+    search.index_product(doc)
+    return doc_to_out(doc)
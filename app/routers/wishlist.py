@@ -1,15 +1,26 @@
 # app/routers/wishlist.py
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional, Union
+from pymongo import ReturnDocument
 from ..deps import get_database
-from ..models.wishlist import COLLECTION as WISHLIST_COLL
-from ..models.product import doc_to_out, COLLECTION as PRODUCT_COLL
+from ..models.wishlist import COLLECTION as WISHLIST_COLL, add_item_pipeline, item_ids
+from ..models.product import COLLECTION as PRODUCT_COLL
+from ..utils import catalog_cache
 from bson import ObjectId
-from ..schemas.wishlist import WishlistAdd, WishlistResponse
+from ..schemas.wishlist import WishlistAdd, WishlistResponse, WishlistExpanded
 import datetime
 
 router = APIRouter(prefix="/wishlist", tags=["wishlist"])
 
+# Only the item ids are needed to build a response
+ITEMS_PROJECTION = {"_id": 0, "items.product_id": 1}
+
+
+async def _product_exists(db, product_id: str) -> bool:
+    if catalog_cache.get_product(product_id) is not catalog_cache.MISSING:
+        return True
+    return await db[PRODUCT_COLL].find_one({"_id": ObjectId(product_id)}, {"_id": 1}) is not None
+
 
 @router.post("/add", response_model=WishlistResponse)
 async def add_to_wishlist(payload: WishlistAdd, db=Depends(get_database)):
@@ -17,20 +28,18 @@ async def add_to_wishlist(payload: WishlistAdd, db=Depends(get_database)):
     product_id = payload.product_id
     if not ObjectId.is_valid(product_id):
         raise HTTPException(status_code=400, detail="Invalid product id")
-    product_obj = await db[PRODUCT_COLL].find_one({"_id": ObjectId(product_id)})
-    if not product_obj:
+    if not await _product_exists(db, product_id):
         raise HTTPException(status_code=404, detail="Product not found")
-    # upsert wishlist
+    # upsert wishlist; a product already on the list keeps its original entry
     now = datetime.datetime.utcnow()
-    await db[WISHLIST_COLL].update_one(
+    doc = await db[WISHLIST_COLL].find_one_and_update(
         {"owner": owner},
-        {"$addToSet": {"items": {"product_id": ObjectId(product_id), "added_at": now}}, "$setOnInsert": {"created_at": now}},
+        add_item_pipeline(ObjectId(product_id), now),
+        projection=ITEMS_PROJECTION,
         upsert=True,
+        return_document=ReturnDocument.AFTER,
     )
-    # return simplified response
-    doc = await db[WISHLIST_COLL].find_one({"owner": owner})
-    items = [str(it["product_id"]) for it in doc.get("items", [])]
-    return {"owner": owner, "items": items}
+    return {"owner": owner, "items": item_ids(doc)}
 
 
 @router.post("/remove", response_model=WishlistResponse)
@@ -39,18 +48,27 @@ async def remove_from_wishlist(payload: WishlistAdd, db=Depends(get_database)):
     product_id = payload.product_id
     if not ObjectId.is_valid(product_id):
         raise HTTPException(status_code=400, detail="Invalid product id")
-    await db[WISHLIST_COLL].update_one({"owner": owner}, {"$pull": {"items": {"product_id": ObjectId(product_id)}}})
-    doc = await db[WISHLIST_COLL].find_one({"owner": owner})
-    if not doc:
-        return {"owner": owner, "items": []}
-    items = [str(it["product_id"]) for it in doc.get("items", [])]
-    return {"owner": owner, "items": items}
-
-
-@router.get("/{owner}", response_model=WishlistResponse)
-async def get_wishlist(owner: str, db=Depends(get_database)):
-    doc = await db[WISHLIST_COLL].find_one({"owner": owner})
-    if not doc:
-        return {"owner": owner, "items": []}
-    items = [str(it["product_id"]) for it in doc.get("items", [])]
-    return {"owner": owner, "items": items}
+    doc = await db[WISHLIST_COLL].find_one_and_update(
+        {"owner": owner},
+        {"$pull": {"items": {"product_id": ObjectId(product_id)}}},
+        projection=ITEMS_PROJECTION,
+        return_document=ReturnDocument.AFTER,
+    )
+    return {"owner": owner, "items": item_ids(doc)}
+
+
+@router.get("/{owner}", response_model=Union[WishlistExpanded, WishlistResponse])
+async def get_wishlist(
+    owner: str,
+    expand: Optional[str] = Query(None, description="'products' to include the product cards"),
+    db=Depends(get_database),
+):
+    if expand not in (None, "products"):
+        raise HTTPException(status_code=400, detail="expand must be 'products'")
+    doc = await db[WISHLIST_COLL].find_one({"owner": owner}, ITEMS_PROJECTION)
+    items = item_ids(doc)
+    if expand != "products":
+        return {"owner": owner, "items": items}
+    # One $in for every card not already cached; deleted products are left out
+    products = await catalog_cache.load_products(db, items)
+    return {"owner": owner, "items": items, "products": products}
@@ -7,3 +7,5 @@ from .customer import *
 from .wishlist import *
 from .common import *
 from .stats import *
+from .upload import *
+from .admin import *
@@ -0,0 +1,13 @@
+# app/schemas/admin.py
+from pydantic import BaseModel, Field
+
+
+class AdminLogin(BaseModel):
+    email: str = Field(..., min_length=1, max_length=320)
+    password: str = Field(..., min_length=1, max_length=256)
+
+
+class AdminToken(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
+    expires_in: int  # seconds
@@ -1,5 +1,5 @@
 # app/schemas/cart.py
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Dict
 
 
@@ -8,6 +8,15 @@ class CartItem(BaseModel):
     quantity: int
 
 
+class CartItemAdd(BaseModel):
+    product_id: str
+    quantity: int = Field(1, ge=1, description="Units to add to the product's line")
+
+
+class CartItemQuantity(BaseModel):
+    quantity: int = Field(..., ge=0, description="New quantity for the line; 0 removes it")
+
+
 class CartCreate(BaseModel):
     session_id: str  # cookie or customer token
     items: List[CartItem]
@@ -9,5 +9,6 @@ class IDResponse(BaseModel):
 
 class Pagination(BaseModel):
     limit: int
-    offset: int
+    offset: int = 0
     total: Optional[int] = None
+    next_cursor: Optional[str] = None  # pass back as `after` to fetch the next page
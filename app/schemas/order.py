@@ -1,6 +1,7 @@
 # backend/app/schemas/order.py
 from pydantic import BaseModel, Field, EmailStr
 from typing import List, Optional, Dict
+from .common import Pagination
 
 
 class CheckoutItem(BaseModel):
@@ -8,8 +9,17 @@ class CheckoutItem(BaseModel):
     quantity: int
 
 
+class CheckoutCustomer(BaseModel):
+    name: str
+    email: EmailStr
+    phone: Optional[str] = ""
+    address: Optional[str] = ""
+
+
 class CheckoutRequest(BaseModel):
     items: List[CheckoutItem]
+    customer: CheckoutCustomer
+    save_profile: bool = False
     email: Optional[EmailStr] = None
     shipping_address: Optional[Dict] = None
     billing_address: Optional[Dict] = None
@@ -18,15 +28,39 @@ class CheckoutRequest(BaseModel):
 
 class OrderResponse(BaseModel):
     id: str
+    order_number: str
+    status: str
+    total: float
+    created_at: str
+    backordered: List[str] = []  # product ids whose stock could not be reserved
+    customer_token: Optional[str] = None
+
+class OrderSummary(BaseModel):
+    id: str
+    order_number: Optional[str] = None
+    user_id: Optional[str] = None
+    customer_name: Optional[str] = None
+    email: Optional[EmailStr] = None
     status: str
     total_amount: float
-    items: List[Dict]
+    item_count: int = 0
+    backordered: List[str] = []
+    created_at: Optional[str] = None
+
 
 class OrderOut(BaseModel):
     id: str
+    order_number: Optional[str] = None
     user_id: Optional[str] = None
+    customer_name: Optional[str] = None
     email: Optional[EmailStr] = None
     status: str
     total_amount: float
     items: List[Dict]
+    backordered: List[str] = []
     created_at: Optional[str] = None
+
+
+class OrderPage(BaseModel):
+    items: List[OrderSummary]
+    pagination: Pagination
@@ -1,6 +1,7 @@
 # app/schemas/product.py
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict
+from .common import Pagination
 
 
 class ProductCreate(BaseModel):
@@ -38,4 +39,9 @@ class ProductOut(BaseModel):
     metadata: Optional[Dict] = {}
 
     class Config:
-        allow_population_by_field_name = True  # Allow both 'name' and 'title'
\ No newline at end of file
+        allow_population_by_field_name = True  # Allow both 'name' and 'title'
+
+
+class ProductPage(BaseModel):
+    items: List[ProductOut]
+    pagination: Pagination
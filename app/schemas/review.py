@@ -1,6 +1,7 @@
 # app/schemas/review.py
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
+from .common import Pagination
 from datetime import datetime
 
 class ReviewCreate(BaseModel):
@@ -18,4 +19,9 @@ class ReviewOut(BaseModel):
     created_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class ReviewPage(BaseModel):
+    items: List[dict]
+    pagination: Pagination
@@ -0,0 +1,21 @@
+# app/schemas/upload.py
+from pydantic import BaseModel, Field
+from typing import List, Optional, Union
+
+
+class UploadSignRequest(BaseModel):
+    count: int = Field(1, ge=1, le=20, description="Number of images to sign for")
+    eager: Optional[str] = None  # defaults to CLOUDINARY_EAGER
+
+
+class UploadedAsset(BaseModel):
+    # Fields copied from Cloudinary's upload response
+    public_id: str
+    version: Union[int, str]
+    signature: str
+    format: Optional[str] = None
+
+
+class UploadFinalize(BaseModel):
+    product_id: str
+    assets: List[UploadedAsset] = Field(..., min_length=1, max_length=20)
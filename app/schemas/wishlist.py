@@ -1,6 +1,7 @@
 # app/schemas/wishlist.py
 from pydantic import BaseModel
 from typing import List
+from .product import ProductOut
 
 
 class WishlistAdd(BaseModel):
@@ -11,3 +12,7 @@ class WishlistAdd(BaseModel):
 class WishlistResponse(BaseModel):
     owner: str
     items: List[str]
+
+
+class WishlistExpanded(WishlistResponse):
+    products: List[ProductOut]
@@ -1,4 +1,6 @@
 # app/security.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from passlib.context import CryptContext
 from jose import jwt, JWTError
@@ -7,6 +9,10 @@ from .config import settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt is deliberately slow (hundreds of ms of CPU); it runs on this small
+# pool so it never blocks the event loop and logins can't take every core.
+_bcrypt_pool = ThreadPoolExecutor(max_workers=settings.BCRYPT_WORKERS, thread_name_prefix="bcrypt")
+
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
@@ -16,6 +22,14 @@ def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
 
 
+async def hash_password_async(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(_bcrypt_pool, hash_password, password)
+
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    return await asyncio.get_running_loop().run_in_executor(_bcrypt_pool, verify_password, plain, hashed)
+
+
 def create_access_token(subject: str, expires_in: Optional[int] = None) -> str:
     if expires_in is None:
         expires_in = settings.JWT_EXPIRES_SECONDS
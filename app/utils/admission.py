@@ -0,0 +1,234 @@
+# app/utils/admission.py
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from limits import RateLimitItem, parse
+from limits.aio.strategies import FixedWindowRateLimiter
+from limits.storage import storage_from_string
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from ..config import settings
+from .client_ip import client_ip
+
+# Path prefix -> route group. Anything else (/, /docs, /metrics, ...) is not admission-controlled.
+ROUTE_GROUPS: Tuple[Tuple[str, str], ...] = (
+    ("/checkout", "checkout"),
+    ("/cart", "checkout"),
+    ("/products", "catalog"),
+    ("/reviews", "catalog"),
+    ("/wishlist", "catalog"),
+    ("/admin", "admin"),
+    ("/stats", "admin"),
+    ("/uploads", "admin"),
+    ("/orders", "admin"),
+)
+
+
+def _async_storage_uri(uri: str) -> str:
+    # The async+ variant of a storage never blocks the event loop (redis included)
+    return uri if uri.startswith("async+") else "async+" + uri
+
+
+limiter = FixedWindowRateLimiter(storage_from_string(_async_storage_uri(settings.RATE_LIMIT_STORAGE_URI)))
+
+
+class RouteGroup:
+    """
+    Concurrency budget for one route group. `limit` is adapted between
+    `min_limit` and `max_limit` from observed latency when `target` is set.
+    """
+
+    def __init__(self, name: str, priority: int, limit: int, queue: int, rate: str, target: Optional[float]):
+        self.name = name
+        self.priority = priority  # 0 may use the reserved headroom and is woken first
+        self.max_limit = limit
+        self.min_limit = max(1, limit // 8)
+        self.limit = limit
+        self.queue = queue
+        self.rate: RateLimitItem = parse(rate)
+        self.target = target
+        self.active = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+        self.admitted = 0
+        self.shed = 0
+        self.rate_limited = 0
+        self._window_n = 0
+        self._window_sum = 0.0
+
+
+class AdmissionController:
+    """
+    Per-group concurrency limits with bounded FIFO queues, under a total
+    in-flight cap. Lower-priority groups can't take the last `reserve` slots,
+    and freed slots go to the highest-priority waiters first, so checkout
+    keeps moving while browsing is shed.
+
+    Limits adapt AIMD-style: every `window` completed requests, a group whose
+    mean service time exceeded its target has its limit cut by a quarter
+    (down to max_limit / 8); otherwise it grows by one up to its configured
+    maximum. When Mongo slows down, fewer requests pile into it and the
+    rest fail fast instead of queueing. Event-loop only.
+    """
+
+    def __init__(self, groups: List[RouteGroup], total_limit: int, reserve: int, queue_timeout: float, window: int = 50):
+        self.groups = {g.name: g for g in groups}
+        self._by_priority = sorted(groups, key=lambda g: g.priority)
+        self.total_limit = total_limit
+        self.reserve = reserve
+        self.queue_timeout = queue_timeout
+        self.window = window
+        self.active = 0
+
+    def group_for(self, path: str) -> Optional[RouteGroup]:
+        for prefix, name in ROUTE_GROUPS:
+            if path == prefix or path.startswith(prefix + "/"):
+                return self.groups.get(name)
+        return None
+
+    def _can_admit(self, g: RouteGroup) -> bool:
+        headroom = self.total_limit - (0 if g.priority == 0 else self.reserve)
+        return g.active < g.limit and self.active < headroom
+
+    def _grant(self, g: RouteGroup) -> None:
+        g.active += 1
+        g.admitted += 1
+        self.active += 1
+
+    def _free(self, g: RouteGroup) -> None:
+        g.active -= 1
+        self.active -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        for g in self._by_priority:
+            while g.waiters and self._can_admit(g):
+                fut = g.waiters.popleft()
+                if not fut.done():
+                    self._grant(g)
+                    fut.set_result(None)
+
+    async def acquire(self, g: RouteGroup) -> bool:
+        """Take a slot in `g`, waiting up to queue_timeout; False means shed the request."""
+        if not g.waiters and self._can_admit(g):
+            self._grant(g)
+            return True
+        if len(g.waiters) >= g.queue:
+            g.shed += 1
+            return False
+        fut = asyncio.get_running_loop().create_future()
+        g.waiters.append(fut)
+        try:
+            await asyncio.wait_for(fut, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._forget(g, fut)
+            g.shed += 1
+            return False
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self._free(g)  # granted just as the client went away
+            else:
+                self._forget(g, fut)
+            raise
+        return True
+
+    def _forget(self, g: RouteGroup, fut: asyncio.Future) -> None:
+        try:
+            g.waiters.remove(fut)
+        except ValueError:
+            pass
+
+    def release(self, g: RouteGroup, seconds: float) -> None:
+        if g.target is not None:
+            g._window_n += 1
+            g._window_sum += seconds
+            if g._window_n >= self.window:
+                if g._window_sum / g._window_n > g.target:
+                    g.limit = max(g.min_limit, int(g.limit * 0.75))
+                else:
+                    g.limit = min(g.max_limit, g.limit + 1)
+                g._window_n = 0
+                g._window_sum = 0.0
+        self._free(g)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active": self.active,
+            "total_limit": self.total_limit,
+            "groups": {
+                g.name: {
+                    "limit": g.limit,
+                    "max_limit": g.max_limit,
+                    "active": g.active,
+                    "queued": len(g.waiters),
+                    "admitted": g.admitted,
+                    "shed": g.shed,
+                    "rate_limited": g.rate_limited,
+                }
+                for g in self._by_priority
+            },
+        }
+
+
+def _target() -> float:
+    return settings.ADMISSION_TARGET_LATENCY_MS / 1000
+
+
+admission = AdmissionController(
+    [
+        RouteGroup("checkout", 0, settings.ADMISSION_CHECKOUT_LIMIT, settings.ADMISSION_CHECKOUT_QUEUE, settings.RATE_LIMIT_CHECKOUT, _target()),
+        # admin exports and reports are slow by nature; don't adapt on their latency
+        RouteGroup("admin", 1, settings.ADMISSION_ADMIN_LIMIT, settings.ADMISSION_ADMIN_QUEUE, settings.RATE_LIMIT_ADMIN, None),
+        RouteGroup("catalog", 2, settings.ADMISSION_CATALOG_LIMIT, settings.ADMISSION_CATALOG_QUEUE, settings.RATE_LIMIT_CATALOG, _target()),
+    ],
+    total_limit=settings.ADMISSION_MAX_CONCURRENT,
+    reserve=settings.ADMISSION_CHECKOUT_RESERVE,
+    queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+)
+
+
+class AdmissionMiddleware:
+    """
+    Pure ASGI middleware applying, per route group, the client-IP rate limit
+    (429, when RATE_LIMIT_ENABLED; see client_ip for how the IP is found)
+    and then the concurrency budget (503 when the queue is full or the
+    wait times out). Both carry Retry-After. Paths outside every group and
+    CORS preflights pass straight through.
+    """
+
+    def __init__(self, app: ASGIApp, controller: Optional[AdmissionController] = None) -> None:
+        self.app = app
+        self.controller = controller or admission
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+        group = self.controller.group_for(scope["path"])
+        if group is None:
+            await self.app(scope, receive, send)
+            return
+
+        if settings.RATE_LIMIT_ENABLED:
+            ip = client_ip(scope)
+            if not await limiter.hit(group.rate, group.name, ip):
+                group.rate_limited += 1
+                reset_at = (await limiter.get_window_stats(group.rate, group.name, ip)).reset_time
+                retry = max(1, math.ceil(reset_at - time.time()))
+                await self._reject(scope, receive, send, 429, f"Rate limit exceeded: {group.rate}", retry)
+                return
+
+        if not await self.controller.acquire(group):
+            await self._reject(scope, receive, send, 503, "Server busy, try again shortly.", max(1, math.ceil(self.controller.queue_timeout)))
+            return
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(group, time.perf_counter() - start)
+
+    @staticmethod
+    async def _reject(scope: Scope, receive: Receive, send: Send, status: int, detail: str, retry_after: int) -> None:
+        response = JSONResponse({"detail": detail}, status_code=status, headers={"Retry-After": str(retry_after)})
+        await response(scope, receive, send)
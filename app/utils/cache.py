@@ -0,0 +1,126 @@
+# app/utils/cache.py
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger("uvicorn")
+
+MISSING = object()
+
+
+class TTLCache:
+    """
+    Bounded in-process cache with per-entry TTL and LRU eviction.
+
+    Not thread-safe: it's meant to be used from the event loop only.
+    Values are stored by reference, so callers must not mutate what they get back.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store `value`; `ttl` overrides the cache-wide TTL for this entry."""
+        if self.maxsize <= 0:
+            return
+        self._data[key] = (self._clock() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class RefreshingValue:
+    """
+    A single cached value produced by an async loader (stale-while-revalidate).
+
+    Fresh for `ttl` seconds; after that the stale value keeps being served while
+    one background task reloads it. Past `max_stale` (or before the first load)
+    callers wait for a load, and concurrent callers share it.
+    """
+
+    def __init__(self, loader: Callable[..., Awaitable[Any]], ttl: float, max_stale: float, clock: Callable[[], float] = time.monotonic):
+        self.loader = loader
+        self.ttl = ttl
+        self.max_stale = max(max_stale, ttl)
+        self._clock = clock
+        self._value: Any = MISSING
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+        self._refresh: Optional[asyncio.Task] = None
+        self.loads = 0
+        self.hits = 0
+
+    async def _load(self, *args) -> None:
+        value = await self.loader(*args)
+        self._value, self._loaded_at = value, self._clock()
+        self.loads += 1
+
+    async def _background_load(self, *args) -> None:
+        try:
+            await self._load(*args)
+        except Exception as e:
+            logger.warning(f"Background refresh failed, serving stale value: {e}")
+
+    async def get(self, *args) -> Any:
+        age = self._clock() - self._loaded_at
+        if self._value is MISSING or age > self.max_stale:
+            async with self._lock:
+                if self._value is MISSING or self._clock() - self._loaded_at > self.max_stale:
+                    await self._load(*args)
+                    return self._value
+            # another caller loaded it while we waited; judge freshness by that load
+            age = self._clock() - self._loaded_at
+        self.hits += 1
+        if age > self.ttl and (self._refresh is None or self._refresh.done()):
+            self._refresh = asyncio.create_task(self._background_load(*args))
+        return self._value
+
+    def age(self) -> Optional[float]:
+        return None if self._value is MISSING else self._clock() - self._loaded_at
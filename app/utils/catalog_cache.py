@@ -0,0 +1,107 @@
+# app/utils/catalog_cache.py
+"""
+Read-through cache for the storefront catalog (`GET /products/...`).
+
+Entries hold `doc_to_out` dicts. Every route that writes a product must call
+`invalidate_product` so readers never see a stale catalog for longer than the
+write itself; the TTL only bounds staleness from writes we don't control
+(e.g. stock decremented by checkout, edits made straight in the database).
+"""
+from typing import Any, Dict, Hashable, Iterable, List, Optional
+from app.config import settings
+from app.models.product import COLLECTION as PRODUCT_COLL, category_key, doc_to_out
+from bson import ObjectId
+from .cache import MISSING, TTLCache
+
+product_cache = TTLCache(settings.CATALOG_CACHE_MAX_PRODUCTS, settings.CATALOG_CACHE_TTL_SECONDS)
+listing_cache = TTLCache(settings.CATALOG_CACHE_MAX_LISTINGS, settings.CATALOG_CACHE_TTL_SECONDS)
+
+# Bumped on every invalidation. Readers capture it before querying Mongo and only
+# fill the cache if it hasn't moved, so a read racing a write can't re-cache old data.
+_generation = 0
+
+
+def generation() -> int:
+    return _generation
+
+
+def listing_key(
+    limit: int,
+    offset: int,
+    category: Optional[str],
+    subcategories: Optional[Iterable[str]],
+    after: Optional[str] = None,
+) -> Hashable:
+    """
+    Normalize list-query params so equivalent queries share an entry:
+    category matching is case-insensitive and subcategories is an unordered `$in`.
+    """
+    return (
+        limit,
+        offset,
+        category_key(category),
+        tuple(sorted(set(subcategories))) if subcategories else (),
+        after,
+    )
+
+
+def get_product(product_id: str) -> Any:
+    return product_cache.get(product_id)
+
+
+def get_listing(key: Hashable) -> Any:
+    return listing_cache.get(key)
+
+
+def store_product(product: Dict, gen: int) -> None:
+    if gen == _generation:
+        product_cache.set(product["id"], product)
+
+
+def store_listing(key: Hashable, products: List[Dict], gen: int) -> None:
+    if gen == _generation:
+        listing_cache.set(key, products)
+        for p in products:
+            product_cache.set(p["id"], p)
+
+
+async def load_products(db, product_ids: List[str]) -> List[Dict]:
+    """
+    Products for `product_ids` (valid ObjectId strings) in the given order, served
+    from the cache where possible and with one `$in` query for the rest.
+    Ids that no longer exist are skipped.
+    """
+    found = {}
+    misses = []
+    for pid in product_ids:
+        cached = product_cache.get(pid)
+        if cached is MISSING:
+            misses.append(pid)
+        else:
+            found[pid] = cached
+    if misses:
+        gen = _generation
+        async for d in db[PRODUCT_COLL].find({"_id": {"$in": [ObjectId(pid) for pid in misses]}}):
+            out = doc_to_out(d)
+            found[out["id"]] = out
+            store_product(out, gen)
+    return [found[pid] for pid in product_ids if pid in found]
+
+
+def invalidate_product(product_id: Optional[str] = None) -> None:
+    """
+    Drop a product (or, with no id, every product) and all cached listings,
+    since any listing may contain it or change shape because of it.
+    """
+    global _generation
+    _generation += 1
+    if product_id is None:
+        product_cache.clear()
+    else:
+        product_cache.pop(str(product_id))
+    listing_cache.clear()
+
+
+def cache_stats() -> Dict[str, Any]:
+    return {"products": product_cache.stats(), "listings": listing_cache.stats()}
+
@@ -0,0 +1,50 @@
+# app/utils/client_ip.py
+import ipaddress
+from typing import List, Optional, Union
+from starlette.types import Scope
+from ..config import settings
+
+_Network = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+def parse_networks(spec: str) -> List[_Network]:
+    """Comma-separated IPs/CIDRs, e.g. "10.0.0.0/8, 127.0.0.1"."""
+    return [ipaddress.ip_network(part.strip(), strict=False) for part in spec.split(",") if part.strip()]
+
+
+def _is_trusted(ip: str, trusted: List[_Network]) -> bool:
+    try:
+        addr = ipaddress.ip_address(ip)
+    except ValueError:
+        return False
+    return any(addr in net for net in trusted)
+
+
+def _forwarded_for(scope: Scope) -> List[str]:
+    hops: List[str] = []
+    for name, value in scope.get("headers", ()):
+        if name == b"x-forwarded-for":
+            hops.extend(h.strip() for h in value.decode("latin-1").split(","))
+    return [h for h in hops if h]
+
+
+def client_ip(scope: Scope, trusted: Optional[List[_Network]] = None) -> str:
+    """
+    The address a request came from. X-Forwarded-For is only believed when
+    the peer is a trusted proxy, and then only up to the first hop (from the
+    right) that isn't one: anything left of that was written by the client
+    and can be spoofed freely.
+    """
+    trusted = TRUSTED_PROXIES if trusted is None else trusted
+    client = scope.get("client")
+    ip = client[0] if client else "unknown"
+    if not trusted or not _is_trusted(ip, trusted):
+        return ip
+    for hop in reversed(_forwarded_for(scope)):
+        ip = hop
+        if not _is_trusted(hop, trusted):
+            break
+    return ip
+
+
+TRUSTED_PROXIES = parse_networks(settings.TRUSTED_PROXIES)
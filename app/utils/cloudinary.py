@@ -1,8 +1,18 @@
 # app/utils/cloudinary.py
-import time
+import asyncio
 import hashlib
+import hmac
+import logging
+import shutil
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional
+from cloudinary import uploader
 from app.config import settings
-from typing import Dict
+
+logger = logging.getLogger("uvicorn")
 
 
 def cloudinary_signature(params: Dict[str, str]) -> Dict[str, str]:
@@ -15,11 +25,147 @@ def cloudinary_signature(params: Dict[str, str]) -> Dict[str, str]:
     # Cloudinary expects params sorted by key, like "param1=value1&param2=value2..."
     signed_pairs = "&".join(f"{k}={params_to_sign[k]}" for k in sorted(params_to_sign.keys()))
     to_sign = f"{signed_pairs}&timestamp={timestamp}" if signed_pairs else f"timestamp={timestamp}"
-    to_hash = f"{to_sign}{settings.CLOUDINARY_API_SECRET}"
-    signature = hashlib.sha1(to_hash.encode("utf-8")).hexdigest()
+    signature = _sign(to_sign)
     return {
         "cloud_name": settings.CLOUDINARY_CLOUD_NAME,
         "api_key": settings.CLOUDINARY_API_KEY,
         "timestamp": timestamp,
         "signature": signature,
     }
+
+
+def _sign(to_sign: str) -> str:
+    return hashlib.sha1(f"{to_sign}{settings.CLOUDINARY_API_SECRET}".encode("utf-8")).hexdigest()
+
+
+def scoped_upload_params(folder: str, eager: Optional[str]) -> Dict[str, str]:
+    """
+    Parameters for one direct upload, pinned to a server-chosen public_id so a
+    signature can't be reused to overwrite another asset. Everything returned
+    here is covered by the signature and must be posted to Cloudinary as-is.
+    """
+    params = {"folder": folder, "public_id": uuid.uuid4().hex}
+    if eager:
+        # generate the derived sizes in the background on Cloudinary's side
+        params["eager"] = eager
+        params["eager_async"] = "true"
+    return {**params, **cloudinary_signature(params)}
+
+
+def verify_upload_signature(public_id: str, version: str, signature: str) -> bool:
+    """
+    Check the `signature` Cloudinary returns with an upload result, proving the
+    (public_id, version) pair came from Cloudinary and not from the client.
+    """
+    expected = _sign(f"public_id={public_id}&version={version}")
+    return hmac.compare_digest(expected, signature)
+
+
+def delivery_url(public_id: str, version: str, fmt: Optional[str]) -> str:
+    suffix = f".{fmt}" if fmt else ""
+    return f"https://res.cloudinary.com/{settings.CLOUDINARY_CLOUD_NAME}/image/upload/v{version}/{public_id}{suffix}"
+
+
+# --- Image uploads ---
+# The Cloudinary SDK is synchronous, so uploads run on a bounded thread pool
+# instead of blocking the event loop, and several images upload concurrently.
+# Backends take a network `timeout` so a stalled call returns and frees its
+# pool thread; waiting on the future alone would leave the thread blocked.
+
+_upload_pool = ThreadPoolExecutor(max_workers=settings.UPLOAD_WORKERS, thread_name_prefix="upload")
+
+
+class UploadError(Exception):
+    """Raised when any image of a batch fails; already-uploaded images are removed."""
+
+
+class CloudinaryUploader:
+    def upload(self, file: BinaryIO, folder: str, timeout: Optional[float] = None) -> Dict[str, str]:
+        result = uploader.upload(file, folder=folder, timeout=timeout)
+        return {"public_id": result["public_id"], "secure_url": result["secure_url"]}
+
+    def destroy(self, public_id: str, timeout: Optional[float] = None) -> None:
+        uploader.destroy(public_id, timeout=timeout)
+
+
+class LocalUploader:
+    """
+    Offline stand-in for Cloudinary: writes files under `root` and returns
+    URLs under `base_url` (served by the app when UPLOAD_BACKEND=local).
+    `latency` simulates network time per upload, for tests and benchmarks;
+    past `timeout` the upload gives up like a stalled network call would.
+    """
+
+    def __init__(self, root: str, base_url: str, latency: float = 0.0):
+        self.root = Path(root)
+        self.base_url = base_url.rstrip("/")
+        self.latency = latency
+
+    def upload(self, file: BinaryIO, folder: str, timeout: Optional[float] = None) -> Dict[str, str]:
+        if self.latency:
+            if timeout is not None and self.latency > timeout:
+                time.sleep(timeout)
+                raise TimeoutError(f"upload timed out after {timeout}s")
+            time.sleep(self.latency)
+        public_id = f"{folder}/{uuid.uuid4().hex}"
+        path = self.root / public_id
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as out:
+            shutil.copyfileobj(file, out)
+        return {"public_id": public_id, "secure_url": f"{self.base_url}/{public_id}"}
+
+    def destroy(self, public_id: str, timeout: Optional[float] = None) -> None:
+        (self.root / public_id).unlink(missing_ok=True)
+
+
+def get_uploader():
+    if settings.UPLOAD_BACKEND == "local":
+        return LocalUploader(settings.UPLOAD_LOCAL_DIR, settings.UPLOAD_LOCAL_BASE_URL)
+    return CloudinaryUploader()
+
+
+async def _destroy_all(backend, public_ids: List[str]) -> None:
+    loop = asyncio.get_running_loop()
+    results = await asyncio.gather(
+        *(loop.run_in_executor(_upload_pool, backend.destroy, pid, settings.UPLOAD_TIMEOUT_SECONDS) for pid in public_ids),
+        return_exceptions=True,
+    )
+    for pid, res in zip(public_ids, results):
+        if isinstance(res, Exception):
+            logger.warning(f"Failed to remove orphaned upload {pid}: {res}")
+
+
+async def delete_uploads(public_ids: List[str], backend=None) -> None:
+    """Best-effort removal of uploaded assets (e.g. when the product insert fails)."""
+    await _destroy_all(backend or get_uploader(), public_ids)
+
+
+async def upload_images(files: List[BinaryIO], folder: str, backend=None, timeout: Optional[float] = None) -> List[Dict[str, str]]:
+    """
+    Upload `files` concurrently on the upload pool, each bounded by `timeout`.
+    Returns [{public_id, secure_url}] in input order. If any upload fails or
+    times out, the ones that succeeded are deleted and UploadError is raised.
+    """
+    backend = backend or get_uploader()
+    timeout = settings.UPLOAD_TIMEOUT_SECONDS if timeout is None else timeout
+    loop = asyncio.get_running_loop()
+
+    def _cleanup_late(fut: asyncio.Future) -> None:
+        # A timed-out upload can still finish in its thread; don't leave it orphaned
+        if not fut.cancelled() and fut.exception() is None:
+            loop.run_in_executor(_upload_pool, backend.destroy, fut.result()["public_id"], timeout)
+
+    async def one(file: BinaryIO) -> Dict[str, str]:
+        fut = loop.run_in_executor(_upload_pool, backend.upload, file, folder, timeout)
+        try:
+            return await asyncio.wait_for(asyncio.shield(fut), timeout)
+        except asyncio.TimeoutError:
+            fut.add_done_callback(_cleanup_late)
+            raise
+
+    results = await asyncio.gather(*(one(f) for f in files), return_exceptions=True)
+    failures = [r for r in results if isinstance(r, BaseException)]
+    if failures:
+        await _destroy_all(backend, [r["public_id"] for r in results if not isinstance(r, BaseException)])
+        raise UploadError(f"{len(failures)} of {len(files)} image upload(s) failed") from failures[0]
+    return results
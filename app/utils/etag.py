@@ -1,7 +1,9 @@
 # app/utils/etag.py
 import hashlib
 import json
-from typing import Any
+from typing import Any, List, Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 def compute_etag(obj: Any) -> str:
     """
@@ -11,3 +13,101 @@ def compute_etag(obj: Any) -> str:
     encoded = json.dumps(obj, sort_keys=True, separators=(",", ":"), default=str)
     h = hashlib.sha1(encoded.encode("utf-8")).hexdigest()
     return f'W/"{h}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Weak comparison of an If-None-Match header against an ETag (RFC 9110 §13.1.2).
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+# Headers that describe the (omitted) body and must not go out with a 304
+_ENTITY_HEADERS = (b"content-length", b"content-type", b"content-encoding")
+
+
+class ETagMiddleware:
+    """
+    Pure ASGI middleware adding a weak ETag to successful JSON GET responses
+    and answering `304 Not Modified` when it matches the client's If-None-Match.
+
+    The tag is a SHA-1 of the response bytes, hashed chunk by chunk as the app
+    sends them. Chunks are held in a list until the final one arrives (headers
+    must precede the body), so there is no quadratic re-concatenation and no
+    JSON round trip. Responses larger than `max_bytes` are flushed and streamed
+    through untagged as soon as they cross the limit.
+    """
+
+    def __init__(self, app: ASGIApp, max_bytes: int = 1_048_576) -> None:
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        start: Optional[Message] = None
+        chunks: List[bytes] = []
+        hasher = hashlib.sha1()
+        size = 0
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, size, passthrough
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                content_length = headers.get("content-length")
+                if (
+                    message["status"] != 200
+                    or "application/json" not in headers.get("content-type", "")
+                    or "etag" in headers
+                    or (content_length is not None and int(content_length) > self.max_bytes)
+                ):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message
+                return
+
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            size += len(body)
+            if size > self.max_bytes:
+                # Too big to be worth tagging: flush what we held and stream the rest
+                passthrough = True
+                await send(start)
+                if chunks:
+                    await send({"type": "http.response.body", "body": b"".join(chunks), "more_body": True})
+                    chunks.clear()
+                await send(message)
+                return
+
+            hasher.update(body)
+            chunks.append(body)
+            if message.get("more_body", False):
+                return
+
+            etag = f'W/"{hasher.hexdigest()}"'
+            if etag_matches(if_none_match, etag):
+                headers = MutableHeaders(raw=[(k, v) for k, v in start["headers"] if k.lower() not in _ENTITY_HEADERS])
+                headers["etag"] = etag
+                await send({"type": "http.response.start", "status": 304, "headers": headers.raw})
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+            MutableHeaders(scope=start)["etag"] = etag
+            await send(start)
+            await send({"type": "http.response.body", "body": b"".join(chunks)})
+
+        await self.app(scope, receive, send_wrapper)
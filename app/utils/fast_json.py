@@ -0,0 +1,42 @@
+# app/utils/fast_json.py
+from functools import lru_cache
+from typing import Any, Optional
+from fastapi import Response
+from pydantic import TypeAdapter
+from ..config import settings
+
+
+class FastJSONResponse(Response):
+    """A JSON response whose body is already rendered bytes."""
+    media_type = "application/json"
+
+
+@lru_cache(maxsize=None)
+def _adapter(tp: Any) -> TypeAdapter:
+    # Building the core schema is the expensive part; do it once per type
+    return TypeAdapter(tp)
+
+
+def dump_json(tp: Any, content: Any) -> bytes:
+    """
+    Validate `content` (e.g. `doc_to_out` dicts) against `tp` and render it to
+    JSON in one pydantic-core pass, with the same aliases and defaults as
+    FastAPI's `response_model` handling.
+    """
+    adapter = _adapter(tp)
+    return adapter.dump_json(adapter.validate_python(content), by_alias=True)
+
+
+def respond(tp: Any, content: Any, response: Optional[Response] = None) -> Any:
+    """
+    With FAST_JSON on, return `content` as a pre-rendered `FastJSONResponse`
+    typed as `tp`, so FastAPI skips its own validation, `jsonable_encoder` and
+    stdlib `json` passes; headers set on the injected `response` are carried
+    over. With it off, return `content` unchanged for the normal path.
+    """
+    if not settings.FAST_JSON:
+        return content
+    headers = None
+    if response is not None:
+        headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+    return FastJSONResponse(dump_json(tp, content), headers=headers)
@@ -0,0 +1,107 @@
+# app/utils/login_throttle.py
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from ..config import settings
+from .cache import MISSING, TTLCache
+
+
+class Saturated(Exception):
+    """No verification slot became free in time."""
+
+
+class LoginThrottle:
+    """
+    Admission control for password logins, checked before any bcrypt work:
+
+    - per-IP exponential backoff: after `free_attempts` failures, each further
+      failure locks the IP out for base * 2**n seconds (capped), and requests
+      during the lockout are refused without touching bcrypt. `attempt()`
+      checks and counts in one step, before any await, so concurrent
+      attempts from one IP can't all pass the check while the first is
+      still being verified; a correct password clears the count;
+    - a cap on verifications running or queued at once (`slot()`), so a login
+      storm waits or fails fast instead of piling up work on the bcrypt pool.
+
+    Failure counts live in a bounded TTL cache and are forgotten after
+    `window` seconds. State is per worker process. Event-loop only.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        queue_timeout: float,
+        free_attempts: int,
+        backoff_base: float,
+        backoff_max: float,
+        window: float,
+        max_tracked: int = 10_000,
+    ):
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self.queue_timeout = queue_timeout
+        self.free_attempts = free_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._failures = TTLCache(max_tracked, window)  # ip -> (failures, locked_until)
+
+    def retry_after(self, ip: str) -> float:
+        """Seconds until `ip` may try again; 0 when it isn't locked out."""
+        entry = self._failures.get(ip)
+        if entry is MISSING:
+            return 0.0
+        return max(0.0, entry[1] - time.monotonic())
+
+    def attempt(self, ip: str) -> float:
+        """
+        Seconds `ip` must wait, or 0 after counting this attempt as a failure
+        until `succeeded()` (or `refund()`, when it was never verified).
+        """
+        wait = self.retry_after(ip)
+        if wait > 0:
+            return wait
+        self.failed(ip)
+        return 0.0
+
+    def refund(self, ip: str) -> None:
+        """Uncount an attempt that never got to check the password."""
+        entry = self._failures.get(ip)
+        if entry is MISSING:
+            return
+        failures = entry[0] - 1
+        if failures <= 0:
+            self._failures.pop(ip)
+        else:
+            self._failures.set(ip, (failures, entry[1] if failures > self.free_attempts else 0.0))
+
+    def failed(self, ip: str) -> None:
+        entry = self._failures.get(ip)
+        failures = 1 if entry is MISSING else entry[0] + 1
+        locked_until = 0.0
+        if failures > self.free_attempts:
+            delay = min(self.backoff_max, self.backoff_base * 2 ** (failures - self.free_attempts - 1))
+            locked_until = time.monotonic() + delay
+        self._failures.set(ip, (failures, locked_until))
+
+    def succeeded(self, ip: str) -> None:
+        self._failures.pop(ip)
+
+    @asynccontextmanager
+    async def slot(self):
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise Saturated()
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+
+admin_login_throttle = LoginThrottle(
+    max_concurrent=settings.LOGIN_MAX_CONCURRENT,
+    queue_timeout=settings.LOGIN_QUEUE_TIMEOUT_SECONDS,
+    free_attempts=settings.LOGIN_FREE_ATTEMPTS,
+    backoff_base=settings.LOGIN_BACKOFF_BASE_SECONDS,
+    backoff_max=settings.LOGIN_BACKOFF_MAX_SECONDS,
+    window=settings.LOGIN_FAILURE_WINDOW_SECONDS,
+)
@@ -0,0 +1,331 @@
+# app/utils/metrics.py
+import bisect
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from pymongo import monitoring
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from .admission import admission as admission_controller
+
+# Seconds; suits both connection checkout waits and request latencies
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram. Not locked itself; callers that record from
+    several threads hold their own lock around `observe`.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Cumulative counts per upper bound ("le" label, last one "+Inf"), Prometheus-style."""
+        cumulative = []
+        running = 0
+        for bound, n in zip(self.buckets + (None,), self.counts):
+            running += n
+            cumulative.append(("+Inf" if bound is None else repr(bound), running))
+        return {"buckets": cumulative, "sum": self.sum, "count": self.count}
+
+
+class _PoolStats:
+    __slots__ = ("created", "closed", "checked_out", "waiting", "checkouts", "checkout_failures", "cleared", "wait")
+
+    def __init__(self):
+        self.created = 0  # connections opened over the pool's lifetime
+        self.closed = 0
+        self.checked_out = 0  # currently in use
+        self.waiting = 0  # operations currently waiting for a connection
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.cleared = 0
+        self.wait = Histogram()  # checkout wait time, seconds
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """
+    Connection pool listener for `AsyncIOMotorClient(event_listeners=[...])`.
+
+    Events arrive on Motor's executor threads, so updates are locked. A
+    checkout is started and completed on the same thread, which is how wait
+    time is measured when the driver doesn't report a duration itself.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pools: Dict[Tuple[str, int], _PoolStats] = {}
+        self._local = threading.local()
+
+    def _pool(self, address) -> _PoolStats:
+        stats = self._pools.get(address)
+        if stats is None:
+            stats = self._pools[address] = _PoolStats()
+        return stats
+
+    def _waited(self, event) -> Optional[float]:
+        started = getattr(self._local, "started", None)
+        self._local.started = None
+        duration = getattr(event, "duration", None)
+        if duration is not None:
+            return duration
+        return None if started is None else time.perf_counter() - started
+
+    # --- pool lifecycle ---
+    def pool_created(self, event):
+        with self._lock:
+            self._pool(event.address)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self._pool(event.address).cleared += 1
+
+    def pool_closed(self, event):
+        pass
+
+    # --- connections ---
+    def connection_created(self, event):
+        with self._lock:
+            self._pool(event.address).created += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self._pool(event.address).closed += 1
+
+    # --- checkouts ---
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+        with self._lock:
+            self._pool(event.address).waiting += 1
+
+    def connection_check_out_failed(self, event):
+        waited = self._waited(event)
+        with self._lock:
+            stats = self._pool(event.address)
+            stats.waiting -= 1
+            stats.checkout_failures += 1
+            if waited is not None:
+                stats.wait.observe(waited)
+
+    def connection_checked_out(self, event):
+        waited = self._waited(event)
+        with self._lock:
+            stats = self._pool(event.address)
+            stats.waiting -= 1
+            stats.checked_out += 1
+            stats.checkouts += 1
+            if waited is not None:
+                stats.wait.observe(waited)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self._pool(event.address).checked_out -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                f"{host}:{port}": {
+                    "created": s.created,
+                    "closed": s.closed,
+                    "open": s.created - s.closed,
+                    "checked_out": s.checked_out,
+                    "waiting": s.waiting,
+                    "checkouts": s.checkouts,
+                    "checkout_failures": s.checkout_failures,
+                    "cleared": s.cleared,
+                    "checkout_wait_seconds": s.wait.snapshot(),
+                }
+                for (host, port), s in self._pools.items()
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+class RequestMetrics:
+    """
+    Per-route latency histograms and per-status counts. Only touched from the
+    event loop, so no locking. Routes are labelled by their path template
+    (`/products/{product_id}`), never the raw path, to keep label sets small.
+    """
+
+    def __init__(self):
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.statuses: Dict[Tuple[str, str, int], int] = {}
+
+    def record(self, method: str, route: str, status: int, seconds: float) -> None:
+        key = (method, route)
+        hist = self.latency.get(key)
+        if hist is None:
+            hist = self.latency[key] = Histogram()
+        hist.observe(seconds)
+        skey = (method, route, status)
+        self.statuses[skey] = self.statuses.get(skey, 0) + 1
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware timing every HTTP request into `RequestMetrics`.
+    The route template is read from `scope["route"]`, which FastAPI's router
+    fills in once it has matched; requests that match nothing are counted
+    under "unmatched". An exception with no response started counts as a 500.
+    """
+
+    def __init__(self, app: ASGIApp, metrics: Optional[RequestMetrics] = None) -> None:
+        self.app = app
+        self.metrics = metrics or request_metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            self.metrics.record(scope["method"], path, status, time.perf_counter() - start)
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """
+    Command listener for `AsyncIOMotorClient(event_listeners=[...])`
+    recording duration per (collection, command) and failure counts. Events
+    arrive on Motor's executor threads, so updates are locked.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight: Dict[Tuple[Any, int], Tuple[str, str]] = {}
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.failures: Dict[Tuple[str, str], int] = {}
+
+    @staticmethod
+    def _collection(event) -> str:
+        command = event.command
+        # getMore names its collection separately; most others use the command's value
+        target = command.get("collection") if event.command_name == "getMore" else command.get(event.command_name)
+        return target if isinstance(target, str) else ""
+
+    def started(self, event):
+        self._inflight[(event.connection_id, event.request_id)] = (self._collection(event), event.command_name)
+
+    def _finished(self, event, failed: bool):
+        key = self._inflight.pop((event.connection_id, event.request_id), None) or ("", event.command_name)
+        with self._lock:
+            hist = self.latency.get(key)
+            if hist is None:
+                hist = self.latency[key] = Histogram()
+            hist.observe(event.duration_micros / 1e6)
+            if failed:
+                self.failures[key] = self.failures.get(key, 0) + 1
+
+    def succeeded(self, event):
+        self._finished(event, False)
+
+    def failed(self, event):
+        self._finished(event, True)
+
+
+request_metrics = RequestMetrics()
+command_metrics = CommandMetrics()
+
+
+# --- Prometheus text exposition ---
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _histogram_lines(name: str, series: Iterable[Tuple[Dict[str, Any], Dict[str, Any]]]) -> List[str]:
+    lines = [f"# TYPE {name} histogram"]
+    for labels, snap in series:
+        for le, count in snap["buckets"]:
+            lines.append(f"{name}_bucket{_labels(**labels, le=le)} {count}")
+        lines.append(f"{name}_sum{_labels(**labels)} {snap['sum']}")
+        lines.append(f"{name}_count{_labels(**labels)} {snap['count']}")
+    return lines
+
+
+def _simple_lines(name: str, kind: str, series: Iterable[Tuple[Dict[str, Any], Any]]) -> List[str]:
+    lines = [f"# TYPE {name} {kind}"]
+    lines.extend(f"{name}{_labels(**labels)} {value}" for labels, value in series)
+    return lines
+
+
+def render_prometheus() -> str:
+    """Request, Mongo command and connection pool metrics in Prometheus text format (v0.0.4)."""
+    lines = _histogram_lines(
+        "http_request_duration_seconds",
+        (({"method": m, "route": r}, h.snapshot()) for (m, r), h in sorted(request_metrics.latency.items())),
+    )
+    lines += _simple_lines(
+        "http_requests_total", "counter",
+        (({"method": m, "route": r, "status": s}, n) for (m, r, s), n in sorted(request_metrics.statuses.items())),
+    )
+
+    with command_metrics._lock:
+        commands = sorted((key, h.snapshot()) for key, h in command_metrics.latency.items())
+        failures = sorted(command_metrics.failures.items())
+    lines += _histogram_lines(
+        "mongodb_command_duration_seconds",
+        (({"collection": c, "command": cmd}, snap) for (c, cmd), snap in commands),
+    )
+    lines += _simple_lines(
+        "mongodb_command_failures_total", "counter",
+        (({"collection": c, "command": cmd}, n) for (c, cmd), n in failures),
+    )
+
+    pools = sorted(pool_metrics.snapshot().items())
+    for field, name, kind in (
+        ("created", "mongodb_pool_connections_created_total", "counter"),
+        ("open", "mongodb_pool_connections_open", "gauge"),
+        ("checked_out", "mongodb_pool_connections_checked_out", "gauge"),
+        ("waiting", "mongodb_pool_checkout_waiting", "gauge"),
+        ("checkout_failures", "mongodb_pool_checkout_failures_total", "counter"),
+    ):
+        lines += _simple_lines(name, kind, (({"server": server}, p[field]) for server, p in pools))
+    lines += _histogram_lines(
+        "mongodb_pool_checkout_wait_seconds",
+        (({"server": server}, p["checkout_wait_seconds"]) for server, p in pools),
+    )
+
+    admission = admission_controller.stats()["groups"]
+    for field, name, kind in (
+        ("limit", "http_admission_limit", "gauge"),
+        ("active", "http_admission_active", "gauge"),
+        ("queued", "http_admission_queued", "gauge"),
+        ("shed", "http_admission_shed_total", "counter"),
+        ("rate_limited", "http_admission_rate_limited_total", "counter"),
+    ):
+        lines += _simple_lines(name, kind, (({"group": group}, g[field]) for group, g in admission.items()))
+    return "\n".join(lines) + "\n"
@@ -1,5 +1,8 @@
 # app/utils/pagination.py
-from typing import Tuple
+from typing import Dict, Tuple
+from bson import ObjectId
+import base64
+import datetime
 
 DEFAULT_LIMIT = 24
 MAX_LIMIT = 200
@@ -13,3 +16,38 @@ def parse_limit_offset(limit: int | None, offset: int | None) -> Tuple[int, int]
     if not offset or offset < 0:
         offset = 0
     return int(limit), int(offset)
+
+
+# --- Keyset (cursor) pagination ---
+# A cursor is an opaque token for the (created_at, _id) of the last item on a page.
+# Listings sort by created_at desc with _id as tiebreaker, so the next page is
+# everything strictly "before" that pair, which a (created_at, _id) index serves
+# as a range scan no matter how deep the client has paged.
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def encode_cursor(created_at: datetime.datetime, oid: ObjectId) -> str:
+    ms = (created_at.replace(tzinfo=None) - _EPOCH) // datetime.timedelta(milliseconds=1)
+    raw = f"{ms}:{oid}".encode("ascii")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[datetime.datetime, ObjectId]:
+    """
+    Raises ValueError for anything that isn't a cursor we issued.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode("ascii")
+        ms, oid = raw.split(":", 1)
+        return _EPOCH + datetime.timedelta(milliseconds=int(ms)), ObjectId(oid)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def keyset_filter(token: str, field: str = "created_at") -> Dict:
+    """
+    Mongo filter selecting documents after `token` in (field desc, _id desc) order.
+    """
+    ts, oid = decode_cursor(token)
+    return {"$or": [{field: {"$lt": ts}}, {field: ts, "_id": {"$lt": oid}}]}
@@ -0,0 +1,56 @@
+# app/utils/pricing.py
+from typing import Dict, Iterable, List
+from bson import ObjectId
+from fastapi import HTTPException
+from ..models.product import COLLECTION as PRODUCT_COLL, PRICING_PROJECTION, effective_price
+
+
+def canonical_id(product_id: str) -> str:
+    """The id as `str(ObjectId)` renders it; ObjectId accepts upper-case hex."""
+    return str(ObjectId(product_id))
+
+
+async def resolve_products(db, product_ids: Iterable[str], projection: Dict = PRICING_PROJECTION) -> Dict[str, Dict]:
+    """
+    Fetch every referenced product in a single `$in` query.
+
+    Returns a dict keyed by the canonical (lower-case hex) string product id,
+    see `canonical_id`. Raises 400 listing all
+    malformed ids, or 404 listing all ids that don't exist, so the client
+    gets the full picture in one response instead of failing on the first one.
+    """
+    ids = list(dict.fromkeys(product_ids))  # dedupe, keep order
+    invalid = [pid for pid in ids if not ObjectId.is_valid(pid)]
+    if invalid:
+        raise HTTPException(status_code=400, detail={"message": "Invalid product id(s)", "product_ids": invalid})
+    ids = list(dict.fromkeys(canonical_id(pid) for pid in ids))  # "64AB..." and "64ab..." are the same product
+    if not ids:
+        return {}
+
+    cursor = db[PRODUCT_COLL].find({"_id": {"$in": [ObjectId(pid) for pid in ids]}}, projection)
+    found = {str(d["_id"]): d for d in await cursor.to_list(length=len(ids))}
+
+    missing = [pid for pid in ids if pid not in found]
+    if missing:
+        raise HTTPException(status_code=404, detail={"message": "Product(s) not found", "product_ids": missing})
+    return found
+
+
+async def price_items(db, items: Iterable) -> List[Dict]:
+    """
+    Resolve and price a list of line items (anything with `product_id` and `quantity`).
+
+    Returns one dict per line: {product_id: ObjectId, product: doc, quantity: int, price: float}.
+    """
+    items = list(items)
+    products = await resolve_products(db, (it.product_id for it in items))
+    lines = []
+    for it in items:
+        prod = products[canonical_id(it.product_id)]
+        lines.append({
+            "product_id": prod["_id"],
+            "product": prod,
+            "quantity": int(it.quantity),
+            "price": effective_price(prod),
+        })
+    return lines
@@ -0,0 +1,234 @@
+# app/utils/search.py
+"""
+In-process inverted index over the product catalog.
+
+Built once per worker from a projected scan of `products`, then kept current
+by the product write routes (`index_product` / `unindex_product`). Because
+other workers' writes never reach this process, the whole index is also
+rebuilt in the background once it is older than SEARCH_INDEX_REFRESH_SECONDS.
+Tokenising runs in a worker thread so a (re)build doesn't stall the event
+loop, and writes made while a build is in flight are replayed onto the new
+index before it is swapped in.
+"""
+import asyncio
+import bisect
+import heapq
+import logging
+import math
+import re
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from app.config import settings
+from app.models.product import COLLECTION as PRODUCT_COLL
+
+logger = logging.getLogger("uvicorn")
+
+# Field weights; mirrored by the Mongo text index in ensure_product_indexes
+FIELD_WEIGHTS = {"name": 10.0, "category": 5.0, "subcategories": 3.0, "description": 1.0}
+SEARCH_PROJECTION = {"name": 1, "description": 1, "metadata.category": 1, "metadata.subcategories": 1, "created_at": 1}
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# The last query term also matches as a prefix once it's this long, expanding
+# to at most this many index terms (bounds the cost of short prefixes).
+MIN_PREFIX = 3
+MAX_PREFIX_TERMS = 32
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+    return [t for t in _TOKEN_RE.findall(text.casefold()) if len(t) > 1]
+
+
+def _doc_fields(d: Dict) -> Dict[str, str]:
+    meta = d.get("metadata") or {}
+    subcats = meta.get("subcategories") or []
+    return {
+        "name": d.get("name") or d.get("title") or "",
+        "category": meta.get("category") or "",
+        "subcategories": " ".join(s for s in subcats if isinstance(s, str)),
+        "description": d.get("description") or "",
+    }
+
+
+class InvertedIndex:
+    """
+    term -> {doc_id: weighted term frequency}, scored with TF-IDF.
+
+    Every query term must match (AND); the last term also matches as a prefix,
+    so partial input like "wool ove" finds "wool overcoat". Ties rank newest first.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self._doc_terms: Dict[str, Dict[str, float]] = {}
+        self._sort_key: Dict[str, float] = {}
+        self._terms: List[str] = []
+        self._terms_dirty = False
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def upsert(self, d: Dict) -> None:
+        doc_id = str(d["_id"])
+        self.remove(doc_id)
+        weights: Dict[str, float] = defaultdict(float)
+        for field, text in _doc_fields(d).items():
+            for term in tokenize(text):
+                weights[term] += FIELD_WEIGHTS[field]
+        for term, w in weights.items():
+            if term not in self._postings:
+                self._terms_dirty = True
+            self._postings[term][doc_id] = w
+        self._doc_terms[doc_id] = dict(weights)
+        created = d.get("created_at")
+        self._sort_key[doc_id] = created.timestamp() if created else 0.0
+
+    def remove(self, doc_id: str) -> None:
+        for term in self._doc_terms.pop(doc_id, {}):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+                self._terms_dirty = True
+        self._sort_key.pop(doc_id, None)
+
+    def _expand_prefix(self, prefix: str) -> List[str]:
+        if len(prefix) < MIN_PREFIX:
+            return [prefix] if prefix in self._postings else []
+        if self._terms_dirty:
+            self._terms = sorted(self._postings)
+            self._terms_dirty = False
+        i = bisect.bisect_left(self._terms, prefix)
+        out = []
+        while i < len(self._terms) and self._terms[i].startswith(prefix) and len(out) < MAX_PREFIX_TERMS:
+            out.append(self._terms[i])
+            i += 1
+        return out
+
+    def search(self, q: str, limit: int, offset: int = 0) -> Tuple[List[str], int]:
+        """
+        Returns (ids for the requested page, total number of matches).
+        """
+        terms = list(dict.fromkeys(tokenize(q)))
+        if not terms:
+            return [], 0
+        n_docs = len(self._doc_terms) or 1
+
+        # each query term becomes a group of index terms (exact, or prefix expansion for the last one)
+        groups = [[t] if t in self._postings else [] for t in terms[:-1]]
+        groups.append(self._expand_prefix(terms[-1]))
+
+        # Score the most selective group first, then only probe its candidates in the others
+        weighted = [[(self._postings[t], math.log(1 + n_docs / len(self._postings[t]))) for t in g] for g in groups]
+        weighted.sort(key=lambda g: sum(len(p) for p, _ in g))
+
+        scores: Dict[str, float] = defaultdict(float)
+        for postings, idf in weighted[0]:
+            for doc_id, w in postings.items():
+                scores[doc_id] += w * idf
+        for group in weighted[1:]:
+            narrowed = {}
+            for doc_id, score in scores.items():
+                extra = sum(p[doc_id] * idf for p, idf in group if doc_id in p)
+                if extra:
+                    narrowed[doc_id] = score + extra
+            scores = narrowed
+        if not scores:
+            return [], 0
+
+        top = heapq.nsmallest(
+            offset + limit,
+            scores,
+            key=lambda doc_id: (-scores[doc_id], -self._sort_key.get(doc_id, 0.0), doc_id),
+        )
+        return top[offset:], len(scores)
+
+
+class ProductSearchIndex:
+    """
+    Owns the worker's InvertedIndex and its (re)building.
+    """
+
+    def __init__(self, max_age: float):
+        self.max_age = max_age
+        self.index: Optional[InvertedIndex] = None
+        self.built_at = 0.0
+        self._lock = asyncio.Lock()
+        self._refreshing: Optional[asyncio.Task] = None
+        # (op, arg) writes seen while a build is in flight; None when no build is running
+        self._pending: Optional[List[Tuple[str, object]]] = None
+
+    @staticmethod
+    def _index_docs(docs: List[Dict]) -> InvertedIndex:
+        # Runs in a worker thread; the new index isn't reachable by anything else yet
+        index = InvertedIndex()
+        for d in docs:
+            index.upsert(d)
+        return index
+
+    async def _build(self, db) -> InvertedIndex:
+        t0 = time.perf_counter()
+        docs = await db[PRODUCT_COLL].find({}, SEARCH_PROJECTION).batch_size(1000).to_list(length=None)
+        index = await asyncio.get_running_loop().run_in_executor(None, self._index_docs, docs)
+        logger.info(f"Built product search index: {len(index)} products in {time.perf_counter() - t0:.2f}s")
+        return index
+
+    async def _rebuild(self, db) -> None:
+        # Log writes from before the scan starts, so any the scan missed are replayed
+        self._pending = []
+        try:
+            index = await self._build(db)
+            for op, arg in self._pending:
+                if op == "upsert":
+                    index.upsert(arg)
+                else:
+                    index.remove(arg)
+            self.index, self.built_at = index, time.monotonic()
+        finally:
+            self._pending = None
+
+    @staticmethod
+    def _refresh_done(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Product search index rebuild failed", exc_info=task.exception())
+
+    async def get(self, db) -> InvertedIndex:
+        if self.index is None:
+            async with self._lock:
+                if self.index is None:
+                    await self._rebuild(db)
+        elif time.monotonic() - self.built_at > self.max_age and (self._refreshing is None or self._refreshing.done()):
+            # serve the current index while a fresh one is built
+            self._refreshing = asyncio.create_task(self._rebuild(db))
+            self._refreshing.add_done_callback(self._refresh_done)
+        return self.index
+
+    def upsert(self, d: Dict) -> None:
+        if self._pending is not None:
+            self._pending.append(("upsert", d))
+        if self.index is not None:
+            self.index.upsert(d)
+
+    def remove(self, product_id) -> None:
+        if self._pending is not None:
+            self._pending.append(("remove", str(product_id)))
+        if self.index is not None:
+            self.index.remove(str(product_id))
+
+
+product_index = ProductSearchIndex(settings.SEARCH_INDEX_REFRESH_SECONDS)
+
+
+def index_product(d: Dict) -> None:
+    """Call after a product is inserted or updated, with the stored document."""
+    product_index.upsert(d)
+
+
+def unindex_product(product_id) -> None:
+    """Call after a product is deleted."""
+    product_index.remove(product_id)
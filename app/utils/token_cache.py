@@ -0,0 +1,73 @@
+# app/utils/token_cache.py
+import datetime
+import hashlib
+import time
+from typing import Any, Dict, Optional
+from jose import JWTError
+from ..config import settings
+from ..models.revoked_token import COLLECTION as REVOKED_COLL
+from .cache import MISSING, TTLCache
+from .jwt import decode_access_token
+
+
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class VerifiedTokenCache:
+    """
+    Decoded payloads of tokens that passed signature, expiry and revocation
+    checks, keyed by the token's SHA-256 digest, so repeated requests with the
+    same token skip the HMAC and JSON decoding.
+
+    An entry lives for the cache TTL or until the token's `exp`, whichever
+    comes first. Revocation is recorded in Mongo (`revoked_tokens`) and drops
+    the entry here at once; other workers notice on their next miss, i.e.
+    within the cache TTL.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize, ttl)
+
+    async def verify(self, token: str, db) -> Optional[Dict[str, Any]]:
+        """The token's payload, or None if it is invalid, expired or revoked."""
+        key = token_digest(token)
+        payload = self._cache.get(key)
+        if payload is not MISSING:
+            return payload
+        try:
+            payload = decode_access_token(token)
+        except JWTError:
+            return None
+        if await db[REVOKED_COLL].find_one({"_id": key}, {"_id": 1}):
+            return None
+        ttl = self._cache.ttl
+        if "exp" in payload:
+            ttl = min(ttl, payload["exp"] - time.time())
+        if ttl > 0:
+            self._cache.set(key, payload, ttl)
+        return payload
+
+    async def revoke(self, token: str, payload: Dict[str, Any], db) -> None:
+        """Reject `token` from now on (its `payload` gives the expiry to remember it until)."""
+        key = token_digest(token)
+        self._cache.pop(key)
+        now = datetime.datetime.utcnow()
+        expires_at = (
+            datetime.datetime.utcfromtimestamp(payload["exp"]) if "exp" in payload
+            else now + datetime.timedelta(seconds=settings.JWT_EXPIRES_SECONDS)
+        )
+        await db[REVOKED_COLL].update_one(
+            {"_id": key},
+            {"$set": {"expires_at": expires_at}, "$setOnInsert": {"revoked_at": now}},
+            upsert=True,
+        )
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+
+admin_tokens = VerifiedTokenCache(settings.ADMIN_TOKEN_CACHE_SIZE, settings.ADMIN_TOKEN_CACHE_TTL_SECONDS)
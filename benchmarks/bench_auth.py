@@ -0,0 +1,80 @@
+# benchmarks/bench_auth.py
+"""
+Admin auth cost per request.
+
+Compares the previous per-request `jwt.decode` (HMAC + JSON + claim checks)
+with `get_admin_claims` on a verified-token cache hit, and on a miss
+(decode plus the revocation lookup, here against an in-process collection
+that answers immediately, so only the CPU side is measured).
+
+Run from the repo root:
+    python -m benchmarks.bench_auth [--requests 20000]
+"""
+import argparse
+import asyncio
+import os
+import time
+
+# Settings are required at import time; nothing here talks to Mongo or Cloudinary.
+for _key, _value in {
+    "MONGO_URI": "mongodb://localhost:27017",
+    "JWT_SECRET": "bench",
+    "CLOUDINARY_CLOUD_NAME": "bench",
+    "CLOUDINARY_API_KEY": "bench",
+    "CLOUDINARY_API_SECRET": "bench",
+}.items():
+    os.environ.setdefault(_key, _value)
+
+from app.deps import get_admin_claims  # noqa: E402
+from app.security import verify_token  # noqa: E402
+from app.utils.jwt import create_access_token  # noqa: E402
+from app.utils.token_cache import admin_tokens  # noqa: E402
+
+
+class _EmptyCollection:
+    async def find_one(self, *args, **kwargs):
+        return None
+
+
+class _EmptyDB:
+    def __getitem__(self, name):
+        return _EmptyCollection()
+
+
+async def measure(fn, n: int) -> float:
+    for _ in range(100):  # warm up
+        await fn()
+    t0 = time.process_time()
+    for _ in range(n):
+        await fn()
+    return (time.process_time() - t0) / n * 1e6
+
+
+async def main(requests: int):
+    token = create_access_token({"sub": "admin@example.com", "role": "admin"})
+    db = _EmptyDB()
+
+    async def decode_every_time():
+        verify_token(token)
+
+    async def cache_hit():
+        await get_admin_claims(token, db)
+
+    async def cache_miss():
+        admin_tokens.clear()
+        await get_admin_claims(token, db)
+
+    rows = [
+        ("jwt.decode per request", await measure(decode_every_time, requests)),
+        ("get_admin_claims, miss", await measure(cache_miss, requests)),
+        ("get_admin_claims, hit", await measure(cache_hit, requests)),
+    ]
+    for label, us in rows:
+        print(f"{label:<26} {us:8.2f} µs CPU/request")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
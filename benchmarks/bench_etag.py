@@ -0,0 +1,131 @@
+# benchmarks/bench_etag.py
+"""
+CPU cost per request of ETag handling for a 200-item `/products/` page.
+
+Compares no ETag handling at all, the previous `@app.middleware("http")` implementation (buffer with
+`body += chunk`, `json.loads`, re-serialize with `sort_keys`, hash) against
+`ETagMiddleware`, plus the 304 short-circuit when the client sends a
+matching If-None-Match. Requests are driven straight through ASGI, so the
+numbers exclude sockets and the database.
+
+Run from the repo root:
+    python -m benchmarks.bench_etag [--items 200] [--requests 2000]
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import time
+
+from bson import ObjectId
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
+
+from app.models.product import doc_to_out
+from app.utils.etag import ETagMiddleware, compute_etag
+
+
+def make_page(n: int) -> list:
+    now = datetime.datetime.utcnow()
+    return [
+        doc_to_out({
+            "_id": ObjectId(),
+            "name": f"Product {i}",
+            "description": "Soft wool overcoat with a relaxed fit and horn buttons. " * 3,
+            "price": 120.0 + i,
+            "sale_price": 99.0,
+            "on_sale": i % 3 == 0,
+            "images": [f"https://res.cloudinary.com/demo/image/upload/v1/ecommerce-products/{i}_{k}.jpg" for k in range(4)],
+            "stock": 100,
+            "metadata": {"category": "Coats", "subcategories": ["OVERCOATS", "WOOL", "Women's"], "rating": 4.5, "reviews": 12},
+            "created_at": now,
+            "updated_at": now,
+        })
+        for i in range(n)
+    ]
+
+
+def build_app(page: list, mode: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/products/")
+    async def products():
+        return JSONResponse(page)
+
+    if mode == "legacy":
+        @app.middleware("http")
+        async def etag_middleware(request: Request, call_next):
+            response: Response = await call_next(request)
+            if request.method == "GET" and "application/json" in (response.headers.get("content-type") or ""):
+                body = b""
+                async for chunk in response.body_iterator:
+                    body += chunk
+                try:
+                    payload = json.loads(body or b"{}")
+                    response.headers["ETag"] = compute_etag(payload)
+                except Exception:
+                    pass
+
+                async def body_iterator():
+                    yield body
+
+                response.body_iterator = body_iterator()
+            return response
+    elif mode == "asgi":
+        app.add_middleware(ETagMiddleware)
+    return app
+
+
+async def call(app, headers=()) -> tuple:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/products/", "raw_path": b"/products/", "root_path": "",
+        "query_string": b"", "headers": list(headers), "server": ("bench", 80), "client": ("bench", 1),
+    }
+    out = {}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            out["status"] = message["status"]
+            out["headers"] = dict(message["headers"])
+        else:
+            out["bytes"] = out.get("bytes", 0) + len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return out["status"], out["headers"].get(b"etag"), out.get("bytes", 0)
+
+
+async def measure(app, n: int, headers=()) -> float:
+    for _ in range(50):  # warm up
+        await call(app, headers)
+    t0 = time.process_time()
+    for _ in range(n):
+        await call(app, headers)
+    return (time.process_time() - t0) / n * 1e6
+
+
+async def main(items: int, requests: int):
+    page = make_page(items)
+    bare, legacy, current = (build_app(page, mode) for mode in ("none", "legacy", "asgi"))
+    status, etag, size = await call(current)
+    print(f"{items}-item page: {size} bytes, etag={etag.decode()}")
+
+    rows = [
+        ("no middleware", await measure(bare, requests)),
+        ("legacy middleware (200)", await measure(legacy, requests)),
+        ("ETagMiddleware (200)", await measure(current, requests)),
+        ("ETagMiddleware (304)", await measure(current, requests, [(b"if-none-match", etag)])),
+    ]
+    for label, us in rows:
+        print(f"{label:<28} {us:9.1f} µs CPU/request")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.items, args.requests))
@@ -0,0 +1,77 @@
+# benchmarks/bench_json.py
+"""
+Per-item cost of rendering a `/products/` page from `doc_to_out` dicts.
+
+Compares FastAPI's default response path (validate against the route's
+`response_model`, `jsonable_encoder`, stdlib `json` via JSONResponse) with
+`fast_json.dump_json` (precompiled TypeAdapter, one pydantic-core pass), on
+24- and 200-item pages. Both bodies are checked to decode to the same JSON.
+
+Run from the repo root:
+    python -m benchmarks.bench_json [--sizes 24 200] [--rounds 500]
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import List
+
+# Settings are required at import time; nothing here talks to Mongo or Cloudinary.
+for _key, _value in {
+    "MONGO_URI": "mongodb://localhost:27017",
+    "JWT_SECRET": "bench",
+    "CLOUDINARY_CLOUD_NAME": "bench",
+    "CLOUDINARY_API_KEY": "bench",
+    "CLOUDINARY_API_SECRET": "bench",
+}.items():
+    os.environ.setdefault(_key, _value)
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+
+from app.routers.products import router  # noqa: E402
+from app.schemas.product import ProductOut  # noqa: E402
+from app.utils.fast_json import dump_json  # noqa: E402
+from benchmarks.bench_etag import make_page  # noqa: E402
+
+LIST_ROUTE = next(r for r in router.routes if r.path == "/products/" and "GET" in r.methods)
+
+
+async def default_path(items: list) -> bytes:
+    content = await serialize_response(field=LIST_ROUTE.response_field, response_content=items)
+    return JSONResponse(content).body
+
+
+async def fast_path(items: list) -> bytes:
+    return dump_json(List[ProductOut], items)
+
+
+async def measure(render, items: list, rounds: int) -> float:
+    for _ in range(20):  # warm up
+        await render(items)
+    t0 = time.process_time()
+    for _ in range(rounds):
+        await render(items)
+    return (time.process_time() - t0) / rounds * 1e6
+
+
+async def main(sizes: List[int], rounds: int):
+    for n in sizes:
+        items = make_page(n)
+        default_body, fast_body = await default_path(items), await fast_path(items)
+        assert json.loads(default_body) == json.loads(fast_body), "fast path renders different JSON"
+        print(f"{n}-item page ({len(fast_body)} bytes)")
+        base = None
+        for label, render in (("FastAPI default", default_path), ("fast_json", fast_path)):
+            us = await measure(render, items, rounds)
+            base = base or us
+            print(f"  {label:<16} {us:9.1f} µs/page {us / n:7.2f} µs/item  x{base / us:.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[24, 200])
+    parser.add_argument("--rounds", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.rounds))
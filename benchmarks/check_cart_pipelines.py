@@ -0,0 +1,159 @@
+# benchmarks/check_cart_pipelines.py
+"""
+Check the cart update pipelines (app/models/cart.py) and POST /cart/upsert
+against a real `mongod`. The in-memory stand-in used by load_test doesn't
+implement every operator they use, so this is the only way to exercise them.
+
+After every step the stored `subtotal`/`total_items` must equal what the
+lines add up to, and no product may have more than one line. Covers adding
+to a missing cart (upsert), bumping a line at its original price,
+appending, setting and removing lines, carts written before the totals
+were stored, and an upsert payload that repeats a product.
+
+Uses a scratch database (--db), dropped before and after. Exits 1 on the
+first failed check.
+
+Run from the repo root:
+    python -m benchmarks.check_cart_pipelines [--mongo-uri mongodb://localhost:27017] [--db shop_cart_check]
+"""
+import argparse
+import asyncio
+import datetime
+import os
+import sys
+from typing import Dict, Optional
+
+for _key, _value in {
+    "MONGO_URI": "mongodb://localhost:27017",
+    "JWT_SECRET": "check",
+    "CLOUDINARY_CLOUD_NAME": "check",
+    "CLOUDINARY_API_KEY": "check",
+    "CLOUDINARY_API_SECRET": "check",
+    "INDEX_STARTUP_MODE": "off",
+}.items():
+    os.environ.setdefault(_key, _value)
+
+import httpx  # noqa: E402
+from bson import ObjectId  # noqa: E402
+from pymongo import ReturnDocument  # noqa: E402
+
+from app.models.cart import COLLECTION as CART_COLL, add_item_pipeline, set_quantity_pipeline  # noqa: E402
+from app.models.product import COLLECTION as PRODUCT_COLL  # noqa: E402
+
+
+class CheckFailed(Exception):
+    pass
+
+
+def check_cart(doc: Optional[Dict], expected: Dict[ObjectId, tuple], step: str) -> None:
+    """`expected`: product_id -> (quantity, price_at_add), in line order."""
+    lines = [(it["product_id"], (it["quantity"], it["price_at_add"])) for it in doc["items"]]
+    if lines != list(expected.items()):
+        raise CheckFailed(f"{step}: items {lines}, expected {list(expected.items())}")
+    subtotal = round(sum(q * p for q, p in expected.values()), 2)
+    total_items = sum(q for q, _ in expected.values())
+    if doc.get("subtotal") != subtotal or doc.get("total_items") != total_items:
+        raise CheckFailed(
+            f"{step}: totals {doc.get('subtotal')}/{doc.get('total_items')}, expected {subtotal}/{total_items}"
+        )
+    print(f"ok  {step}")
+
+
+async def check_pipelines(db) -> None:
+    carts = db[CART_COLL]
+    a, b, c = ObjectId(), ObjectId(), ObjectId()
+    now = datetime.datetime.utcnow()
+
+    async def add(session_id, pid, quantity, price):
+        return await carts.find_one_and_update(
+            {"session_id": session_id}, add_item_pipeline(pid, quantity, price, now),
+            upsert=True, return_document=ReturnDocument.AFTER,
+        )
+
+    async def set_quantity(session_id, pid, quantity):
+        return await carts.find_one_and_update(
+            {"session_id": session_id}, set_quantity_pipeline(pid, quantity, now),
+            return_document=ReturnDocument.AFTER,
+        )
+
+    doc = await add("s1", a, 2, 10.0)
+    check_cart(doc, {a: (2, 10.0)}, "add to a missing cart creates it")
+    if doc.get("created_at") != doc.get("updated_at") or "_line" in doc:
+        raise CheckFailed("add to a missing cart: created_at not set or _line left behind")
+    doc = await add("s1", a, 1, 99.0)
+    check_cart(doc, {a: (3, 10.0)}, "add an existing product bumps its line at the original price")
+    doc = await add("s1", b, 1, 5.55)
+    check_cart(doc, {a: (3, 10.0), b: (1, 5.55)}, "add a new product appends a line")
+    doc = await set_quantity("s1", a, 5)
+    check_cart(doc, {a: (5, 10.0), b: (1, 5.55)}, "set a line's quantity")
+    doc = await set_quantity("s1", a, 0)
+    check_cart(doc, {b: (1, 5.55)}, "set quantity 0 removes the line")
+    doc = await set_quantity("s1", c, 0)
+    check_cart(doc, {b: (1, 5.55)}, "remove a product that isn't in the cart")
+
+    # Written before subtotal/total_items were stored
+    await carts.insert_one({"session_id": "legacy", "items": [
+        {"product_id": a, "quantity": 2, "price_at_add": 1.1},
+        {"product_id": b, "quantity": 1, "price_at_add": 2.2},
+    ]})
+    doc = await add("legacy", b, 2, 3.0)
+    check_cart(doc, {a: (2, 1.1), b: (3, 2.2)}, "legacy cart gets its totals computed on add")
+    await carts.insert_one({"session_id": "legacy-set", "items": [{"product_id": a, "quantity": 4, "price_at_add": 2.5}]})
+    doc = await set_quantity("legacy-set", a, 1)
+    check_cart(doc, {a: (1, 2.5)}, "legacy cart gets its totals computed on set")
+    await carts.insert_one({"session_id": "legacy-empty"})
+    doc = await add("legacy-empty", c, 1, 4.0)
+    check_cart(doc, {c: (1, 4.0)}, "cart without items")
+
+
+async def check_upsert(db) -> None:
+    from app.main import app
+    from app.deps import get_database
+
+    a, b = ObjectId(), ObjectId()
+    await db[PRODUCT_COLL].insert_many([
+        {"_id": a, "name": "A", "price": 10.0, "sale_price": None, "stock": 100},
+        {"_id": b, "name": "B", "price": 2.5, "sale_price": None, "stock": 100},
+    ])
+    app.dependency_overrides[get_database] = lambda: db
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://check") as client:
+        payload = {"session_id": "dup", "items": [
+            {"product_id": str(a), "quantity": 1},
+            {"product_id": str(b), "quantity": 2},
+            {"product_id": str(a).upper(), "quantity": 3},
+        ]}
+        r = await client.post("/cart/upsert", json=payload)
+        if r.status_code != 200:
+            raise CheckFailed(f"upsert: HTTP {r.status_code} {r.text}")
+        doc = await db[CART_COLL].find_one({"session_id": "dup"})
+        check_cart(doc, {a: (4, 10.0), b: (2, 2.5)}, "upsert merges repeated products into one line")
+        r = await client.put(f"/cart/dup/items/{a}", json={"quantity": 1})
+        check_cart(await db[CART_COLL].find_one({"session_id": "dup"}), {a: (1, 10.0), b: (2, 2.5)}, "set after upsert")
+
+
+async def main(args) -> int:
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(args.mongo_uri, serverSelectionTimeoutMS=5000)
+    await client.drop_database(args.db)
+    db = client[args.db]
+    try:
+        await check_pipelines(db)
+        await check_upsert(db)
+    except CheckFailed as e:
+        print(f"FAIL {e}")
+        return 1
+    finally:
+        await client.drop_database(args.db)
+        client.close()
+    print("all cart checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default="shop_cart_check", help="scratch database (dropped before and after); never point at real data")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args)))
@@ -0,0 +1,243 @@
+# benchmarks/load_test.py
+"""
+Load test of the hot endpoints against a seeded dataset.
+
+Seeds a synthetic catalog (see benchmarks/seed.py) into either a local
+`mongod` (--backend mongod, uses --mongo-uri) or an in-memory Motor
+stand-in (--backend memory, needs `pip install mongomock-motor`), then
+drives each scenario with --clients concurrent clients through the app
+in-process (httpx ASGITransport, no sockets):
+
+    products_list    GET  /products/?limit=24[&category=...]
+    product_detail   GET  /products/{id}
+    cart_upsert      POST /cart/upsert
+    cart_add_item    POST /cart/{session_id}/items  (mongod only)
+    checkout         POST /checkout/
+    reviews_product  GET  /reviews/product/{id}
+
+Reports p50/p95/p99 latency and throughput per scenario, and can write the
+results as a JSON baseline (--out) or compare against one (--compare),
+exiting 1 when a scenario's p95 regresses by more than --tolerance.
+benchmarks/baseline.memory.json is the committed default-settings run on
+the memory backend. It has no indexes, so its absolute numbers (seconds for
+reviews_product) mean nothing and it can't catch index or query-plan
+regressions; regenerate it with --out on the same machine before gating a
+change on it, and record a mongod baseline for those.
+The in-memory backend is for relative comparisons of app-side cost only;
+use mongod for numbers that include real query plans.
+
+Run from the repo root:
+    python -m benchmarks.load_test [--backend memory] [--products 2000] [--orders 5000] [--reviews 20000]
+        [--clients 16] [--requests 500] [--out benchmarks/baseline.memory.json] [--compare benchmarks/baseline.memory.json]
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import random
+import sys
+import time
+from typing import Callable, Dict, List
+
+# Settings are required at import time; Cloudinary is never called.
+for _key, _value in {
+    "MONGO_URI": "mongodb://localhost:27017",
+    "JWT_SECRET": "bench",
+    "CLOUDINARY_CLOUD_NAME": "bench",
+    "CLOUDINARY_API_KEY": "bench",
+    "CLOUDINARY_API_SECRET": "bench",
+    "INDEX_STARTUP_MODE": "off",
+    "RATE_LIMIT_ENABLED": "false",  # every client shares one address here
+}.items():
+    os.environ.setdefault(_key, _value)
+
+import httpx  # noqa: E402
+
+from benchmarks.seed import TAXONOMY, seed  # noqa: E402
+
+SCENARIOS = ["products_list", "product_detail", "cart_upsert", "cart_add_item", "checkout", "reviews_product"]
+# Stamped on memory-backend results so a baseline can't pass for real-database numbers
+MEMORY_NOTE = (
+    "in-memory stand-in: no indexes, every query scans the collection; "
+    "tracks app-side cost only and can't catch index or query-plan regressions"
+)
+# Update-pipeline operators these use ($round) aren't implemented by mongomock
+MONGOD_ONLY = {"cart_add_item"}
+
+
+def make_request(scenario: str, rng: random.Random, product_ids: List[str]) -> Callable:
+    """A zero-arg factory returning (method, url, json) for one request of `scenario`."""
+    def items():
+        return [{"product_id": pid, "quantity": rng.randint(1, 3)} for pid in rng.sample(product_ids, rng.randint(1, 4))]
+
+    if scenario == "products_list":
+        def build():
+            category = rng.choice([None, *TAXONOMY])
+            return "GET", "/products/?limit=24" + (f"&category={category}" if category else ""), None
+    elif scenario == "product_detail":
+        def build():
+            return "GET", f"/products/{rng.choice(product_ids)}", None
+    elif scenario == "cart_upsert":
+        def build():
+            return "POST", "/cart/upsert", {"session_id": f"bench-{rng.randrange(10_000)}", "items": items()}
+    elif scenario == "cart_add_item":
+        def build():
+            return "POST", f"/cart/bench-{rng.randrange(10_000)}/items", {"product_id": rng.choice(product_ids), "quantity": 1}
+    elif scenario == "checkout":
+        def build():
+            n = rng.randrange(10_000)
+            customer = {"name": f"Load {n}", "email": f"load{n}@example.com", "phone": "", "address": "1 Bench St"}
+            return "POST", "/checkout/", {"items": items(), "customer": customer}
+    elif scenario == "reviews_product":
+        def build():
+            return "GET", f"/reviews/product/{rng.choice(product_ids)}?limit=20", None
+    else:
+        raise ValueError(f"unknown scenario {scenario!r}")
+    return build
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(p / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+async def run_scenario(client: httpx.AsyncClient, build: Callable, requests: int, clients: int) -> Dict:
+    latencies: List[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            method, url, body = build()
+            t0 = time.perf_counter()
+            r = await client.request(method, url, json=body)
+            latencies.append(time.perf_counter() - t0)
+            if r.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(clients)))
+    wall = time.perf_counter() - start
+    latencies.sort()
+    ms = [v * 1e3 for v in latencies]
+    return {
+        "requests": len(ms),
+        "errors": errors,
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+        "mean_ms": round(sum(ms) / len(ms), 3) if ms else 0.0,
+        "rps": round(len(ms) / wall, 1) if wall else 0.0,
+    }
+
+
+def open_db(backend: str, mongo_uri: str, db_name: str):
+    if backend == "memory":
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            sys.exit("--backend memory needs mongomock-motor: pip install mongomock-motor")
+        return AsyncMongoMockClient()[db_name]
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from app.db import client_options
+    return AsyncIOMotorClient(mongo_uri, **client_options())[db_name]
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> bool:
+    """Print p95/rps deltas against a baseline; True when any p95 regressed beyond tolerance."""
+    regressed = False
+    if baseline.get("backend") != results["backend"]:
+        print(f"note: baseline backend {baseline.get('backend')} differs from this run's {results['backend']}")
+    elif baseline.get("note"):
+        print(f"note: {baseline['note']}")
+    if baseline.get("dataset") != results["dataset"]:
+        print(f"note: baseline dataset {baseline.get('dataset')} differs from this run's {results['dataset']}")
+    print(f"\n{'scenario':<16} {'p95 base':>10} {'p95 now':>10} {'Δ':>8} {'rps base':>10} {'rps now':>10}")
+    for name, now in results["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base:
+            continue
+        delta = (now["p95_ms"] - base["p95_ms"]) / base["p95_ms"] if base["p95_ms"] else 0.0
+        flag = ""
+        if delta > tolerance:
+            regressed, flag = True, "  REGRESSED"
+        print(f"{name:<16} {base['p95_ms']:>10.2f} {now['p95_ms']:>10.2f} {delta:>+8.0%} {base['rps']:>10.1f} {now['rps']:>10.1f}{flag}")
+    return regressed
+
+
+async def main(args) -> int:
+    from app.main import app
+    from app.deps import get_database
+    from app.utils import catalog_cache
+
+    db = open_db(args.backend, args.mongo_uri, args.db)
+    print(f"Seeding {args.products} products, {args.orders} orders, {args.reviews} reviews ({args.backend})...")
+    t0 = time.perf_counter()
+    product_ids = await seed(db, args.products, args.orders, args.reviews, args.seed, drop=True)
+    if args.backend == "mongod":
+        from app.models.indexes import sync_indexes
+        await sync_indexes(db)
+    print(f"  done in {time.perf_counter() - t0:.1f}s")
+
+    app.dependency_overrides[get_database] = lambda: db
+    catalog_cache.invalidate_product()
+    rng = random.Random(args.seed)
+    results = {
+        "created_at": datetime.datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "backend": args.backend,
+        **({"note": MEMORY_NOTE} if args.backend == "memory" else {}),
+        "python": platform.python_version(),
+        "dataset": {"products": args.products, "orders": args.orders, "reviews": args.reviews},
+        "load": {"clients": args.clients, "requests": args.requests},
+        "scenarios": {},
+    }
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"\n{'scenario':<16} {'req':>6} {'err':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9}")
+        for name in args.scenarios:
+            build = make_request(name, rng, product_ids)
+            await run_scenario(client, build, min(50, args.requests), args.clients)  # warm up
+            r = await run_scenario(client, build, args.requests, args.clients)
+            results["scenarios"][name] = r
+            print(f"{name:<16} {r['requests']:>6} {r['errors']:>5} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f} {r['rps']:>9.1f}")
+
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nWrote {args.out}")
+    if args.compare:
+        with open(args.compare) as f:
+            if compare(results, json.load(f), args.tolerance):
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["memory", "mongod"], default="memory")
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default="shop_bench", help="database to seed (dropped first); never point at real data")
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--orders", type=int, default=5000)
+    parser.add_argument("--reviews", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500, help="per scenario")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, help="default: all the backend supports")
+    parser.add_argument("--out", help="write results as a JSON baseline")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p95 regression (0.2 = 20%%)")
+    args = parser.parse_args()
+    if args.scenarios is None:
+        args.scenarios = [s for s in SCENARIOS if args.backend == "mongod" or s not in MONGOD_ONLY]
+    elif args.backend == "memory" and MONGOD_ONLY.intersection(args.scenarios):
+        parser.error(f"{', '.join(sorted(MONGOD_ONLY.intersection(args.scenarios)))} needs --backend mongod")
+    sys.exit(asyncio.run(main(args)))
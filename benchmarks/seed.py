@@ -0,0 +1,198 @@
+# benchmarks/seed.py
+"""
+Synthetic catalog for benchmarks and load tests: products spread over the
+storefront's categories with realistic `metadata.subcategories`, orders
+referencing them, the `sales_daily` rollup of those orders, and reviews
+with matching `rating_stats` on each product.
+
+Deterministic for a given --seed. Against a real server it writes to the
+database named by MONGO_DB (or --db); pass --drop to start clean.
+
+    python -m benchmarks.seed [--products 2000] [--orders 5000] [--reviews 20000] [--drop]
+"""
+import argparse
+import asyncio
+import datetime
+import os
+import random
+from typing import Dict, List
+
+from bson import ObjectId
+
+# Mirrors the options served by GET /products/subcategories
+TAXONOMY = {
+    "Jewelry": [
+        ["NECKLACES", "EARRINGS", "BRACELETS", "RINGS"],
+        ["CRYSTAL COLLECTION", "PEARL COLLECTION", "STATEMENT PIECES", "MINIMALIST"],
+        ["GOLD PLATED", "SILVER PLATED", "ROSE GOLD", "GEMSTONES"],
+    ],
+    "Kids": [
+        ["TOPS", "BOTTOMS", "DRESSES", "OUTERWEAR"],
+        ["BABY (0-2 YEARS)", "TODDLER (2-4 YEARS)", "LITTLE KIDS (4-7 YEARS)", "BIG KIDS (8-12 YEARS)"],
+        ["CASUAL", "FORMAL", "SCHOOL", "SEASONAL"],
+    ],
+    "Coats": [
+        ["Men's", "Women's"],
+        ["OVERCOATS", "TRENCH COATS", "PUFFER JACKETS", "PARKAS"],
+        ["WOOL", "LEATHER", "COTTON", "SYNTHETIC"],
+    ],
+}
+WORDS = "soft classic tailored relaxed warm light everyday statement vintage modern crafted hand finished".split()
+STATUSES = ["pending", "processing", "ready-to-ship", "shipped", "delivered", "cancelled"]
+BATCH = 1000
+
+
+def make_products(rng: random.Random, n: int, now: datetime.datetime) -> List[Dict]:
+    products = []
+    for i in range(n):
+        category = rng.choice(list(TAXONOMY))
+        subcategories = [rng.choice(group) for group in TAXONOMY[category]]
+        price = round(rng.uniform(15, 400), 2)
+        on_sale = rng.random() < 0.2
+        created = now - datetime.timedelta(minutes=rng.randrange(0, 60 * 24 * 365))
+        products.append({
+            "_id": ObjectId(),
+            "name": f"{rng.choice(WORDS).title()} {subcategories[0].title()} {i}",
+            "description": " ".join(rng.choice(WORDS) for _ in range(30)),
+            "price": price,
+            "sale_price": round(price * 0.8, 2) if on_sale else None,
+            "on_sale": on_sale,
+            "stock": 1_000_000,  # checkout load should measure the happy path, not backorders
+            "inStock": True,
+            "images": [f"https://res.cloudinary.com/demo/image/upload/v1/ecommerce-products/{i}_{k}.jpg" for k in range(3)],
+            "category_key": category.casefold(),
+            "metadata": {
+                "category": category,
+                "subcategories": subcategories,
+                "isSale": on_sale,
+                "isNew": rng.random() < 0.1,
+                "isFeatured": rng.random() < 0.05,
+                "rating": 0,
+                "reviews": 0,
+            },
+            "created_at": created,
+            "updated_at": created,
+        })
+    return products
+
+
+def make_orders(rng: random.Random, n: int, products: List[Dict], now: datetime.datetime) -> List[Dict]:
+    orders = []
+    for i in range(n):
+        picked = rng.sample(products, k=min(len(products), rng.randint(1, 4)))
+        items = [
+            {"product_id": p["_id"], "title": p["name"], "qty": rng.randint(1, 3), "price": p["sale_price"] or p["price"], "backordered": False}
+            for p in picked
+        ]
+        total = round(sum(it["qty"] * it["price"] for it in items), 2)
+        orders.append({
+            "order_number": f"ORD-BENCH-{i}",
+            "items": items,
+            "subtotal": total,
+            "total": total,
+            "customer": {"name": f"Customer {i % 997}", "email": f"customer{i % 997}@example.com", "phone": "", "address": ""},
+            "status": rng.choice(STATUSES),
+            "backordered": [],
+            "created_at": now - datetime.timedelta(minutes=rng.randrange(0, 60 * 24 * 365)),
+        })
+    return orders
+
+
+def make_sales_daily(orders: List[Dict]) -> List[Dict]:
+    # What app.jobs.rebuild_sales_daily writes, for stand-ins without $dateTrunc/$merge
+    days: Dict[str, Dict] = {}
+    for o in orders:
+        at = o["created_at"]
+        day = days.setdefault(at.strftime("%Y-%m-%d"), {
+            "_id": at.strftime("%Y-%m-%d"),
+            "date": datetime.datetime(at.year, at.month, at.day),
+            "revenue": 0.0,
+            "orders_count": 0,
+        })
+        day["revenue"] += o["total"]
+        day["orders_count"] += 1
+    return list(days.values())
+
+
+def make_reviews(rng: random.Random, n: int, products: List[Dict], now: datetime.datetime) -> List[Dict]:
+    # Skewed like real traffic: a few products collect most of the reviews
+    weights = [1.0 / (rank + 1) for rank in range(len(products))]
+    reviews = []
+    for p in rng.choices(products, weights=weights, k=n):
+        rating = rng.choices([1, 2, 3, 4, 5], weights=[1, 1, 2, 4, 6])[0]
+        stats = p.setdefault("rating_stats", {"sum": 0, "count": 0, "hist": {}})
+        stats["sum"] += rating
+        stats["count"] += 1
+        stats["hist"][str(rating)] = stats["hist"].get(str(rating), 0) + 1
+        reviews.append({
+            "product_id": p["_id"],
+            "author": f"Reviewer {rng.randrange(10_000)}",
+            "rating": rating,
+            "comment": " ".join(rng.choice(WORDS) for _ in range(12)),
+            "created_at": now - datetime.timedelta(minutes=rng.randrange(0, 60 * 24 * 365)),
+        })
+    return reviews
+
+
+async def _insert(coll, docs: List[Dict]):
+    for i in range(0, len(docs), BATCH):
+        await coll.insert_many(docs[i:i + BATCH], ordered=False)
+
+
+async def seed(db, products: int, orders: int, reviews: int, seed: int = 1, drop: bool = False) -> List[str]:
+    """
+    Write the dataset and return the product ids (as strings) for drivers to pick from.
+    """
+    from app.models.product import COLLECTION as PRODUCT_COLL
+    from app.models.order import COLLECTION as ORDERS_COLL
+    from app.models.review import COLLECTION as REVIEWS_COLL
+    from app.models.sales import COLLECTION as SALES_COLL
+    from app.jobs.rebuild_sales_daily import rebuild
+    from pymongo.errors import OperationFailure
+
+    if drop:
+        for name in (PRODUCT_COLL, ORDERS_COLL, REVIEWS_COLL, "carts", SALES_COLL):
+            await db[name].drop()
+    rng = random.Random(seed)
+    now = datetime.datetime.utcnow()
+    product_docs = make_products(rng, products, now)
+    order_docs = make_orders(rng, orders, product_docs, now)
+    review_docs = make_reviews(rng, reviews, product_docs, now)  # fills product rating_stats
+    await _insert(db[PRODUCT_COLL], product_docs)
+    await _insert(db[ORDERS_COLL], order_docs)
+    await _insert(db[REVIEWS_COLL], review_docs)
+    # Bring the stats endpoints' rollup in line with the orders just written
+    try:
+        await rebuild(db)
+    except OperationFailure:
+        await db[SALES_COLL].delete_many({})
+        await _insert(db[SALES_COLL], make_sales_daily(order_docs))
+    return [str(p["_id"]) for p in product_docs]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--orders", type=int, default=5000)
+    parser.add_argument("--reviews", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--db", default=None, help="database name (default: MONGO_DB)")
+    parser.add_argument("--drop", action="store_true", help="drop the seeded collections first")
+    args = parser.parse_args()
+    if args.db:
+        os.environ["MONGO_DB"] = args.db
+
+    from app.db import get_db, close_client
+    from app.models.indexes import sync_indexes
+
+    try:
+        db = get_db()
+        ids = await seed(db, args.products, args.orders, args.reviews, args.seed, args.drop)
+        await sync_indexes(db)
+        print(f"Seeded {len(ids)} products, {args.orders} orders, {args.reviews} reviews into {db.name}")
+    finally:
+        await close_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())